@@ -1,11 +1,201 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox, scrolledtext
-import csv
-import re
 import os
+import queue
+import sqlite3
 import threading
 
+from customobjects import ConversionOptions, ConverterEngine, default_scenario_name, variant_profiles
+from customobjects.csv_input import CSV_PATTERNS
+from customobjects.progress import ConversionCancelled
+from customobjects.result_cache import default_cache_dir
+from customobjects.usage_index import default_index_path, find_assets, find_skipped, scenario_usage
+from customobjects.watch import CsvWatcher
+
+class QueuedLog:
+    """Thread-safe log sink that the Tk main loop drains in batches
+    
+    The worker thread only puts messages on a queue. A timer on the main
+    loop moves them to the log file and, for on-screen messages, into the
+    text widget, which keeps only the most recent MAX_LINES lines.
+    """
+    
+    MAX_LINES = 5000
+    INTERVAL_MS = 100
+    # Messages handled per timer tick so a flood can't stall the UI
+    MAX_BATCH = 20000
+    
+    # Control items go through the queue too, so they happen in order with
+    # the messages of the run that is still being drained
+    _OPEN_FILE = object()
+    _CLOSE_FILE = object()
+    _CLEAR = object()
+    
+    def __init__(self, root, text_widget):
+        self.root = root
+        self.text_widget = text_widget
+        self.queue = queue.Queue()
+        self.file = None
+        self.line_count = 0
+        self.root.after(self.INTERVAL_MS, self.drain)
+    
+    def put(self, message, show=True):
+        """Queue a message; show=False sends it to the log file only"""
+        self.queue.put((message, show))
+    
+    def open_file(self, path):
+        """Open path now, and log to it once everything queued before this is written"""
+        self.queue.put((self._OPEN_FILE, open(path, 'w', encoding='utf-8')))
+    
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    def request_close_file(self):
+        """Close the log file once everything queued before this is written"""
+        self.queue.put((self._CLOSE_FILE, None))
+    
+    def clear(self):
+        """Clear the text widget once everything queued before this is shown"""
+        self.queue.put((self._CLEAR, None))
+    
+    def drain(self):
+        shown = []
+        try:
+            for _ in range(self.MAX_BATCH):
+                message, show = self.queue.get_nowait()
+                if message is self._OPEN_FILE:
+                    # The second item is the opened file here
+                    self.close_file()
+                    self.file = show
+                elif message is self._CLOSE_FILE:
+                    self.close_file()
+                elif message is self._CLEAR:
+                    # Whatever was collected so far would be cleared right away
+                    shown = []
+                    self._clear_widget()
+                else:
+                    if self.file is not None:
+                        self.file.write(message + "\n")
+                    if show:
+                        shown.append(message)
+        except queue.Empty:
+            pass
+        
+        if shown:
+            self._append(shown)
+        self.root.after(self.INTERVAL_MS, self.drain)
+    
+    def _clear_widget(self):
+        self.text_widget.config(state="normal")
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.config(state="disabled")
+        self.line_count = 0
+    
+    def _append(self, messages):
+        lines = "\n".join(messages).split("\n")[-self.MAX_LINES:]
+        self.text_widget.config(state="normal")
+        self.text_widget.insert(tk.END, "\n".join(lines) + "\n")
+        self.line_count += len(lines)
+        
+        # Drop the oldest lines beyond the ring buffer size
+        excess = self.line_count - self.MAX_LINES
+        if excess > 0:
+            self.text_widget.delete(1.0, f"{excess + 1}.0")
+            self.line_count = self.MAX_LINES
+        
+        self.text_widget.see(tk.END)
+        self.text_widget.config(state="disabled")
+
+class IndexSearchWindow:
+    """Searchable view of a usage index: assets, their scenarios and skipped assets
+    
+    The search runs as you type, a moment after the last key press. Search
+    for "#412" to find the assets with index 412.
+    """
+    
+    DELAY_MS = 250
+    
+    def __init__(self, root, path):
+        self.path = path
+        self.pending = None
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Usage index - {os.path.basename(path)}")
+        self.window.geometry("900x500")
+        
+        search_frame = ttk.Frame(self.window, padding="10")
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="Path contains (or #index):").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        entry.bind('<KeyRelease>', self.schedule_search)
+        self.show_skipped = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Skipped assets", variable=self.show_skipped,
+                         command=self.search).pack(side=tk.LEFT)
+        
+        self.results = ttk.Treeview(self.window, show="headings")
+        self.results.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.results.bind('<<TreeviewSelect>>', self.on_select)
+        
+        self.scenarios = ttk.Treeview(self.window, columns=("scenario", "placements"), show="headings", height=6)
+        for column in ("scenario", "placements"):
+            self.scenarios.heading(column, text=column.capitalize())
+        self.scenarios.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.status_var = tk.StringVar()
+        ttk.Label(self.window, textvariable=self.status_var, anchor=tk.W).pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.search()
+        entry.focus_set()
+    
+    def schedule_search(self, event=None):
+        if self.pending is not None:
+            self.window.after_cancel(self.pending)
+        self.pending = self.window.after(self.DELAY_MS, self.search)
+    
+    def search(self):
+        self.pending = None
+        text = self.search_var.get().strip()
+        try:
+            if self.show_skipped.get():
+                columns = ("Rule", "Path", "Rows", "Scenarios")
+                rows = find_skipped(self.path, text)
+            else:
+                columns = ("Type", "Index", "Path", "First file", "Scenarios", "Placements")
+                if text.startswith("#") and text[1:].isdigit():
+                    rows = find_assets(self.path, asset_index=int(text[1:]))
+                else:
+                    rows = find_assets(self.path, text)
+        except (OSError, sqlite3.Error) as e:
+            self.status_var.set(f"Error: {e}")
+            return
+        
+        self.results.delete(*self.results.get_children())
+        self.scenarios.delete(*self.scenarios.get_children())
+        self.results.config(columns=columns)
+        for column in columns:
+            self.results.heading(column, text=column)
+            self.results.column(column, width=400 if column == "Path" else 80, stretch=column == "Path")
+        for row in rows:
+            self.results.insert("", tk.END, values=row)
+        self.status_var.set(f"{len(rows)} result(s)")
+    
+    def on_select(self, event=None):
+        """Show the per-scenario placements of the selected asset"""
+        self.scenarios.delete(*self.scenarios.get_children())
+        selection = self.results.selection()
+        if not selection or self.show_skipped.get():
+            return
+        entry_type, index = self.results.item(selection[0], "values")[:2]
+        for row in scenario_usage(self.path, entry_type, int(index)):
+            self.scenarios.insert("", tk.END, values=row)
+
 class CustomObjectsConverter:
+    # The preview refreshes this long after the last change, sampling this many bytes of CSV rows
+    PREVIEW_DELAY_MS = 300
+    PREVIEW_SAMPLE_BYTES = 2 * 1024 * 1024
+    
     def __init__(self, root):
         self.root = root
         self.root.title("CustomObjects Converter")
@@ -15,14 +205,37 @@ class CustomObjectsConverter:
         # Data storage
         self.csv_files = []  # List of (csv_path, scenario_name) tuples
         self.output_file = ""
+        self.rules_file = ""  # Empty means the built-in filter rules
+        self.budgets_file = ""  # Empty means no placement budgets
+        self.manifest_file = ""  # Empty means every asset is assumed to ship
+        self.log_file = ""
+        self.watch_stop = None  # threading.Event of the running watch, if any
+        self.cancel_event = None  # threading.Event of the running conversion, if any
+        self.preview_pending = None  # Tk after() id of the scheduled preview refresh
+        self.preview_generation = 0  # Only the newest preview is shown
         
         # Options
         self.add_once_to_blueprints = tk.BooleanVar(value=True)
         self.filter_all_blueprints = tk.BooleanVar(value=False)
+        self.streaming = tk.BooleanVar(value=False)
+        self.collapse_row_messages = tk.BooleanVar(value=True)
+        self.workers = tk.IntVar(value=1)
+        self.use_cache = tk.BooleanVar(value=False)
+        self.run_report = tk.BooleanVar(value=False)
+        self.dedupe = tk.BooleanVar(value=False)
+        self.write_variants = tk.BooleanVar(value=False)
+        self.write_shards = tk.BooleanVar(value=False)
+        self.write_index = tk.BooleanVar(value=False)
+        self.dedupe_tolerance = tk.IntVar(value=0)
         
         # Create UI components
         self.create_ui()
         
+        # Refresh the preview when anything it depends on changes
+        for variable in (self.add_once_to_blueprints, self.filter_all_blueprints, self.rules_var, self.manifest_var):
+            variable.trace_add("write", self.schedule_preview)
+        self.schedule_preview()
+        
     def create_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -90,15 +303,93 @@ class CustomObjectsConverter:
         ttk.Checkbutton(options_frame, text="Filter out ALL Blueprint assets (StaticMesh only)", 
                          variable=self.filter_all_blueprints).pack(anchor=tk.W)
         
+        ttk.Checkbutton(options_frame, text="Low memory mode (spool entries to a temporary file)", 
+                         variable=self.streaming).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Collapse per-row log messages into counts (full log in .log file)", 
+                         variable=self.collapse_row_messages).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Reuse results of unchanged CSVs (cached per user)", 
+                         variable=self.use_cache).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Write a run report with stage timings (.report.json)", 
+                         variable=self.run_report).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Write all variants in one pass (_Once, _NoOnce, _StaticMeshOnly)", 
+                         variable=self.write_variants).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Also write one INI per scenario (into <output>_Scenarios)", 
+                         variable=self.write_shards).pack(anchor=tk.W)
+        
+        ttk.Checkbutton(options_frame, text="Write a searchable asset usage index (.usage.db)", 
+                         variable=self.write_index).pack(anchor=tk.W)
+        
+        dedupe_frame = ttk.Frame(options_frame)
+        dedupe_frame.pack(fill=tk.X)
+        
+        ttk.Checkbutton(dedupe_frame, text="Collapse duplicate placements, tolerance (units):", 
+                         variable=self.dedupe).pack(side=tk.LEFT)
+        ttk.Spinbox(dedupe_frame, from_=0, to=1000, textvariable=self.dedupe_tolerance, width=5).pack(side=tk.LEFT, padx=5)
+        
+        workers_frame = ttk.Frame(options_frame)
+        workers_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(workers_frame, text="Worker processes:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.workers, width=5).pack(side=tk.LEFT, padx=5)
+        
+        rules_frame = ttk.Frame(options_frame)
+        rules_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(rules_frame, text="Filter rules:").pack(side=tk.LEFT)
+        self.rules_var = tk.StringVar(value="(built-in)")
+        ttk.Entry(rules_frame, textvariable=self.rules_var, width=30, state="readonly").pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(rules_frame, text="Browse...", command=self.select_rules).pack(side=tk.LEFT)
+        ttk.Button(rules_frame, text="Default", command=self.reset_rules).pack(side=tk.LEFT)
+        
+        budgets_frame = ttk.Frame(options_frame)
+        budgets_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(budgets_frame, text="Budgets:").pack(side=tk.LEFT)
+        self.budgets_var = tk.StringVar(value="(none)")
+        ttk.Entry(budgets_frame, textvariable=self.budgets_var, width=30, state="readonly").pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(budgets_frame, text="Browse...", command=self.select_budgets).pack(side=tk.LEFT)
+        ttk.Button(budgets_frame, text="None", command=self.reset_budgets).pack(side=tk.LEFT)
+        
+        manifest_frame = ttk.Frame(options_frame)
+        manifest_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(manifest_frame, text="Manifest:").pack(side=tk.LEFT)
+        self.manifest_var = tk.StringVar(value="(none)")
+        ttk.Entry(manifest_frame, textvariable=self.manifest_var, width=30, state="readonly").pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(manifest_frame, text="Browse...", command=self.select_manifest).pack(side=tk.LEFT)
+        ttk.Button(manifest_frame, text="None", command=self.reset_manifest).pack(side=tk.LEFT)
+        
         # Convert button
-        ttk.Button(left_frame, text="CONVERT", command=self.start_conversion, style="Accent.TButton").pack(fill=tk.X, pady=10)
+        convert_frame = ttk.Frame(left_frame)
+        convert_frame.pack(fill=tk.X, pady=(10, 0))
+        self.convert_button = ttk.Button(convert_frame, text="CONVERT", command=self.start_conversion, style="Accent.TButton")
+        self.convert_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = ttk.Button(convert_frame, text="Cancel", command=self.cancel_conversion, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.watch_button = ttk.Button(left_frame, text="Watch CSVs and reconvert on change", command=self.toggle_watch)
+        self.watch_button.pack(fill=tk.X, pady=(5, 0))
+        ttk.Button(left_frame, text="Search usage index...", command=self.open_index_search).pack(fill=tk.X, pady=(5, 10))
         
         # Right side (Log & Status)
-        right_frame = ttk.LabelFrame(main_frame, text="Log", padding="10")
-        right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        right_column = ttk.Frame(main_frame)
+        right_column.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        
+        preview_frame = ttk.LabelFrame(right_column, text="Preview (sampled)", padding="10")
+        preview_frame.pack(fill=tk.X, pady=(0, 5))
+        self.preview_text = tk.Text(preview_frame, height=12, wrap=tk.NONE, state="disabled")
+        self.preview_text.pack(fill=tk.X)
+        
+        right_frame = ttk.LabelFrame(right_column, text="Log", padding="10")
+        right_frame.pack(fill=tk.BOTH, expand=True)
         
         self.log_text = scrolledtext.ScrolledText(right_frame, wrap=tk.WORD, state="disabled")
         self.log_text.pack(fill=tk.BOTH, expand=True)
+        self.log_sink = QueuedLog(self.root, self.log_text)
         
         # Progress bar at bottom
         self.progress_var = tk.DoubleVar()
@@ -125,15 +416,16 @@ class CustomObjectsConverter:
     def add_csv(self):
         files = filedialog.askopenfilenames(
             title="Select CSV Files",
-            filetypes=[("CSV Files", "*.csv")]
+            filetypes=[("CSV Files", CSV_PATTERNS), ("All Files", "*.*")]
         )
         
         if files:
             for file in files:
-                # Default scenario name: use filename without extension
-                scenario_name = f"Scenario_{os.path.splitext(os.path.basename(file))[0]}"
+                # Default scenario name: use filename without extension(s)
+                scenario_name = default_scenario_name(file)
                 self.csv_files.append((file, scenario_name))
                 self.csv_listbox.insert(tk.END, f"{os.path.basename(file)} - {scenario_name}")
+            self.schedule_preview()
     
     def remove_csv(self):
         selection = self.csv_listbox.curselection()
@@ -141,6 +433,7 @@ class CustomObjectsConverter:
             index = selection[0]
             self.csv_listbox.delete(index)
             self.csv_files.pop(index)
+            self.schedule_preview()
     
     def on_csv_select(self, event):
         selection = self.csv_listbox.curselection()
@@ -179,6 +472,7 @@ class CustomObjectsConverter:
             self.csv_listbox.selection_set(index)
             # Keep focus on the entry widget
             self.scenario_entry.focus_set()
+            self.schedule_preview()
         else:
             messagebox.showwarning("Warning", "Scenario name cannot be empty.")
     
@@ -192,7 +486,97 @@ class CustomObjectsConverter:
             self.output_file = file
             self.output_var.set(file)
     
+    def select_rules(self):
+        file = filedialog.askopenfilename(
+            title="Select Filter Rules",
+            filetypes=[("JSON Files", "*.json")]
+        )
+        if file:
+            self.rules_file = file
+            self.rules_var.set(file)
+    
+    def reset_rules(self):
+        self.rules_file = ""
+        self.rules_var.set("(built-in)")
+    
+    def select_budgets(self):
+        file = filedialog.askopenfilename(
+            title="Select Placement Budgets",
+            filetypes=[("JSON Files", "*.json")]
+        )
+        if file:
+            self.budgets_file = file
+            self.budgets_var.set(file)
+    
+    def reset_budgets(self):
+        self.budgets_file = ""
+        self.budgets_var.set("(none)")
+    
+    def select_manifest(self):
+        file = filedialog.askopenfilename(
+            title="Select Asset Manifest",
+            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")]
+        )
+        if file:
+            self.manifest_file = file
+            self.manifest_var.set(file)
+    
+    def reset_manifest(self):
+        self.manifest_file = ""
+        self.manifest_var.set("(none)")
+    
+    def schedule_preview(self, *args):
+        """Refresh the preview once the settings have not changed for a moment"""
+        if self.preview_pending is not None:
+            self.root.after_cancel(self.preview_pending)
+        self.preview_pending = self.root.after(self.PREVIEW_DELAY_MS, self.start_preview)
+    
+    def start_preview(self):
+        self.preview_pending = None
+        self.preview_generation += 1
+        if not self.csv_files:
+            self.show_preview(self.preview_generation, ["Add CSV files to see what the conversion will produce."])
+            return
+        
+        # Options are read here on the Tk thread, the sampling runs in the background
+        try:
+            options = self.build_options()
+        except ValueError as e:
+            # e.g. a spinbox that is being typed into
+            self.show_preview(self.preview_generation, [f"No preview: {e}"])
+            return
+        thread = threading.Thread(target=self.preview,
+                                  args=(self.preview_generation, options, list(self.csv_files)))
+        thread.daemon = True
+        thread.start()
+    
+    def preview(self, generation, options, csv_files):
+        try:
+            engine = ConverterEngine(options, log=lambda message: None)
+            lines = engine.preview(csv_files, self.PREVIEW_SAMPLE_BYTES).lines()
+        except Exception as e:
+            lines = [f"No preview: {e}"]
+        self.root.after(0, self.show_preview, generation, lines)
+    
+    def show_preview(self, generation, lines):
+        if generation != self.preview_generation:
+            # Settings changed since; a newer preview is on its way
+            return
+        self.preview_text.config(state="normal")
+        self.preview_text.delete(1.0, tk.END)
+        self.preview_text.insert(tk.END, "\n".join(lines))
+        self.preview_text.config(state="disabled")
+    
     def start_conversion(self):
+        if self.cancel_event is not None:
+            messagebox.showwarning("Warning", "A conversion is already running.")
+            return
+        
+        if self.watch_stop is not None:
+            # Both would write the same output and log file
+            messagebox.showwarning("Warning", "Stop watching before starting a conversion.")
+            return
+        
         if not self.csv_files:
             messagebox.showwarning("Warning", "Please add at least one CSV file.")
             return
@@ -201,80 +585,95 @@ class CustomObjectsConverter:
             messagebox.showwarning("Warning", "Please select an output file.")
             return
         
-        # Clear log
-        self.log_text.config(state="normal")
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state="disabled")
+        try:
+            options = self.build_options()
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        
+        # Clear log and start the full log file next to the output
+        self.log_sink.clear()
+        self.log_file = os.path.splitext(self.output_file)[0] + ".log"
+        try:
+            self.log_sink.open_file(self.log_file)
+        except OSError as e:
+            messagebox.showwarning("Warning", f"Could not create log file: {e}")
+            self.log_file = ""
         
         # Reset progress
         self.progress_var.set(0)
         
         # Start conversion in a separate thread
-        thread = threading.Thread(target=self.convert)
+        self.cancel_event = threading.Event()
+        self.cancel_button.config(state="normal")
+        self.watch_button.config(state="disabled")
+        thread = threading.Thread(target=self.convert, args=(self.cancel_event, options))
         thread.daemon = True
         thread.start()
     
-    def convert(self):
+    def int_setting(self, variable, name):
+        """Value of an IntVar; ValueError when its spinbox holds no whole number"""
+        try:
+            return variable.get()
+        except tk.TclError:
+            raise ValueError(f"{name} must be a whole number.")
+    
+    def build_options(self):
+        """ConversionOptions from the settings; ValueError if one is invalid"""
+        return ConversionOptions(
+            add_once_to_blueprints=self.add_once_to_blueprints.get(),
+            filter_all_blueprints=self.filter_all_blueprints.get(),
+            rules_file=self.rules_file or None,
+            streaming=self.streaming.get(),
+            collapse_row_messages=self.collapse_row_messages.get(),
+            workers=max(1, self.int_setting(self.workers, "Worker processes")),
+            cache_dir=default_cache_dir() if self.use_cache.get() else None,
+            run_report=self.run_report.get(),
+            dedupe=self.dedupe.get(),
+            dedupe_tolerance=max(0, self.int_setting(self.dedupe_tolerance, "Duplicate tolerance")),
+            budgets_file=self.budgets_file or None,
+            shard_dir=os.path.splitext(self.output_file)[0] + "_Scenarios" if self.write_shards.get() else None,
+            index_db=default_index_path(self.output_file) if self.write_index.get() else None,
+            manifest_file=self.manifest_file or None
+        )
+    
+    def row_detail(self, options):
+        """Collapsed per-row messages still go to the log file"""
+        if options.collapse_row_messages:
+            return lambda kind, message: self.log_sink.put(message, show=False)
+        return None
+    
+    def cancel_conversion(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.status_var.set("Cancelling...")
+    
+    def convert(self, cancel, options):
         self.status_var.set("Converting...")
-        self.log("Starting conversion...")
+        
+        detail = self.row_detail(options)
+        cancelled = False
         
         try:
-            # Separate dictionaries for blueprints and static meshes
-            blueprint_assets = {}  # path -> index
-            staticmesh_assets = {}  # path -> index
-            config_entries = []
-            total_included = 0
-            
-            # Process each CSV file
-            for i, (csv_file, scenario) in enumerate(self.csv_files):
-                self.progress_var.set((i / len(self.csv_files)) * 100)
-                self.log(f"\nProcessing {os.path.basename(csv_file)} for scenario {scenario}...")
-                
-                included = self.process_csv(csv_file, scenario, blueprint_assets, staticmesh_assets, config_entries)
-                total_included += included
-            
-            self.log(f"\nTotal unique assets: {len(blueprint_assets) + len(staticmesh_assets)}")
-            self.log(f"  Blueprint assets: {len(blueprint_assets)}")
-            self.log(f"  Static mesh assets: {len(staticmesh_assets)}")
-            self.log(f"Total configuration entries: {total_included}")
-            
-            # Write to output file
-            with open(self.output_file, 'w') as f:
-                f.write("[/CustomObjects/Mutators/CustomObjects.CustomObjects_C]\n")
-                
-                # First, write all blueprint assets
-                if blueprint_assets:
-                    for path, index in sorted(blueprint_assets.items(), key=lambda x: x[1]):
-                        f.write(f";Index {index}\nAssets=BlueprintGeneratedClass'{path}_C'\n")
-                
-                # Then, write all static mesh assets
-                if staticmesh_assets:
-                    for path, index in sorted(staticmesh_assets.items(), key=lambda x: x[1]):
-                        f.write(f";Index {index}\nStaticMeshAssets=StaticMesh'{path}'\n")
-                
-                # Write config entries
-                for entry in config_entries:
-                    params = [
-                        f"Scenario={entry['Scenario']}",
-                        f"Type={entry['Type']}",
-                        f"AssetIndex={entry['AssetIndex']}",
-                        f"Location={entry['Location']}",
-                        f"Rotation={entry['Rotation']}"
-                    ]
-                    
-                    # Add Once parameter if specified
-                    if entry.get('Once', False):
-                        params.append("Once")
-                    
-                    f.write(f"Configs=({', '.join(params)})\n")
-            
-            self.log(f"\nOutput written to {self.output_file}")
-            self.log("Conversion completed successfully!")
+            # Progress and status are throttled by the engine, so setting the
+            # variables directly keeps up without slowing down the parse
+            engine = ConverterEngine(options, log=self.log, progress=self.progress_var.set, detail=detail,
+                                     status=self.status_var.set, cancel=cancel)
+            if self.write_variants.get():
+                # The two checkboxes above don't apply, each variant sets its own
+                engine.convert_profiles(list(self.csv_files), variant_profiles(self.output_file, options.shard_dir))
+            else:
+                engine.convert(list(self.csv_files), self.output_file)
             self.status_var.set("Done!")
             
             # Show completion message
             self.root.after(0, lambda: messagebox.showinfo("Success", "Conversion completed successfully!"))
         
+        except ConversionCancelled:
+            self.log("\nConversion cancelled, the output was not written")
+            self.status_var.set("Cancelled")
+            cancelled = True
+        
         except Exception as e:
             # Store the error first
             error_message = str(e)
@@ -284,270 +683,84 @@ class CustomObjectsConverter:
             self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {error_message}"))
         
         finally:
-            self.progress_var.set(100)
-    
-    def process_csv(self, csv_file, scenario, blueprint_assets, staticmesh_assets, config_entries):
-        """Process a single CSV file and update assets and config_entries"""
-        skipped_count = 0
-        skipped_bp_count = 0
-        included_count = 0
-        problematic_assets_found = []
-        origin_skipped = 0
-        
-        # Track different asset types
-        staticmesh_count = 0
-        blueprint_count = 0
-        
-        with open(csv_file, 'r') as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader)  # Skip header
-            for row_num, row in enumerate(reader, 1):
-                try:
-                    if len(row) < 6:
-                        continue
-                    
-                    # Parse location first to check if we should skip it
-                    location = self.parse_location(row[2])
-                    if location is None:
-                        origin_skipped += 1
-                        continue
-                    
-                    # Check for blueprint assets first
-                    bp_path = self.parse_blueprint_path(row[1])
-                    if bp_path:
-                        # Skip all blueprints if the option is enabled
-                        if self.filter_all_blueprints.get():
-                            skipped_bp_count += 1
-                            continue
-                            
-                        # It's a blueprint asset
-                        asset_type = "Blueprint"
-                        
-                        # Also check if we should skip this blueprint based on keywords
-                        if self.should_skip_asset(bp_path):
-                            skipped_count += 1
-                            continue
-                            
-                        # Additional specific blueprint filtering
-                        if any(keyword in bp_path for keyword in [
-                            "/Game/Game/Actors/Breakables/", # Breakable objects
-                            "/Game/Game/Actors/ShockwaveReactions/", # Shock wave reaction objects
-                            "BP_SR_",                 # ShockwaveReaction objects
-                            "/Game/Game/Actors/Weapons/", # Weapons
-                            "/Game/Game/Actors/Gear/",    # Gear
-                            "/Game/Game/Actors/Vehicles/", # Vehicles
-                            "/Game/Game/Actors/Characters/", # Characters
-                            "/Game/Game/Actors/Objectives/", # Objectives
-                            "BP_Prop_",               # Prop blueprints
-                            "/Game/Game/AI/",         # AI related assets
-                            "/Game/Game/Actors/World/", # World actors
-                            "/Game/Environment/BluePrints/", # Environment blueprints
-                        ]):
-                            self.log(f"  Skipping possibly problematic blueprint: {bp_path}")
-                            skipped_count += 1
-                            continue
-                        
-                        # If we got here, it's a blueprint we want to keep
-                        self.log(f"  Including blueprint: {bp_path}")
-                        
-                        # Add to blueprint assets dictionary if not already there
-                        if bp_path not in blueprint_assets:
-                            blueprint_assets[bp_path] = len(blueprint_assets)
-                        
-                        rotation = self.parse_rotation(row[3])
-                        
-                        # Create the config entry
-                        config_entry = {
-                            'Scenario': scenario,
-                            'Type': 'Blueprint',
-                            'AssetIndex': blueprint_assets[bp_path],
-                            'Location': location,
-                            'Rotation': rotation
-                        }
-                        
-                        # Add "Once" parameter if enabled
-                        if self.add_once_to_blueprints.get():
-                            config_entry['Once'] = True
-                            
-                        config_entries.append(config_entry)
-                        included_count += 1
-                        blueprint_count += 1
-                    else:
-                        # Try for static mesh
-                        mesh_path = self.parse_mesh_path(row[5])
-                        
-                        # Skip problematic assets
-                        if self.should_skip_asset(mesh_path):
-                            skipped_count += 1
-                            
-                            # Record problematic assets for debugging
-                            problem_assets = [
-                                "/Game/Environment/Props/Exterior/Signs/SM_TrafficSigns_Destroyed_01b",
-                                "/Game/Environment/Props/Exterior/Street/SM_IndPole_03c",
-                                "/Game/Environment/Props/Exterior/Structures/SM_MetalTower__01",
-                                "/Game/Environment/Props/Dev/plastic_chair_TrailerE3"
-                            ]
-                            
-                            for problem in problem_assets:
-                                if mesh_path and problem in mesh_path:
-                                    if mesh_path not in problematic_assets_found:
-                                        problematic_assets_found.append(mesh_path)
-                                        self.log(f"  Found and skipped problematic asset: {mesh_path}")
-                            
-                            continue
-
-                        # Add to static mesh assets dictionary if not already there
-                        if mesh_path not in staticmesh_assets:
-                            staticmesh_assets[mesh_path] = len(staticmesh_assets)
-
-                        rotation = self.parse_rotation(row[3])
-                        config_entries.append({
-                            'Scenario': scenario,
-                            'Type': 'StaticMesh',
-                            'AssetIndex': staticmesh_assets[mesh_path],
-                            'Location': location,
-                            'Rotation': rotation
-                        })
-                        included_count += 1
-                        staticmesh_count += 1
-                except Exception as e:
-                    self.log(f"  Error processing row {row_num}: {str(e)}")
-                    if len(row) >= 6:
-                        self.log(f"  Row content (mesh part): {row[5]}")
-        
-        self.log(f"  Skipped problematic assets: {skipped_count}")
-        if self.filter_all_blueprints.get():
-            self.log(f"  Skipped all blueprints: {skipped_bp_count}")
-        self.log(f"  Skipped objects at origin (0,0,0): {origin_skipped}")
-        self.log(f"  Included assets: {included_count} (StaticMesh: {staticmesh_count}, Blueprint: {blueprint_count})")
-        
-        if not problematic_assets_found:
-            self.log("  No known problematic assets were found in this file.")
-            
-        return included_count
-    
-    def parse_mesh_path(self, meshes_str):
-        """Parse static mesh path from meshes string"""
-        match = re.search(r"StaticMesh'(.+?)'", meshes_str)
-        return match.group(1) if match else None
-        
-    def parse_blueprint_path(self, actor_str):
-        """Parse blueprint path from actor string"""
-        # Match DynamicClass, BlueprintGeneratedClass, or other class paths
-        match = re.search(r"(DynamicClass|BlueprintGeneratedClass)'(.+?)'", actor_str)
-        if match:
-            return match.group(2)
-        return None
-
-    def parse_location(self, location_str):
-        match = re.search(r"X=([-\d.]+),Y=([-\d.]+),Z=([-\d.]+)", location_str)
-        if match:
-            x = int(round(float(match.group(1))))
-            y = int(round(float(match.group(2))))
-            z = int(round(float(match.group(3))))
-            
-            # Skip if location is at origin (0,0,0)
-            if x == 0 and y == 0 and z == 0:
-                return None
-                
-            return f"{x};{y};{z}"
-        return None
-
-    def parse_rotation(self, rotation_str):
-        """
-        Parse rotation string and always use Roll;Pitch;Yaw order 
-        since that's the correct mapping
-        """
-        match = re.search(r"Pitch=([-\d.]+),Yaw=([-\d.]+),Roll=([-\d.]+)", rotation_str)
-        if match:
-            # Get original values
-            pitch = int(round(float(match.group(1))))
-            yaw = int(round(float(match.group(2))))
-            roll = int(round(float(match.group(3))))
-            
-            # Return in RPY order (Roll;Pitch;Yaw)
-            return f"{roll};{pitch};{yaw}"
-        return "0;0;0"
-
-    def should_skip_asset(self, mesh_path):
-        # Skip if path is None
-        if mesh_path is None:
-            return True
-        
-        # Skip specific problematic assets (exact match)
-        problem_assets = [
-            # Static mesh problems
-            "/Game/Environment/Props/Exterior/Signs/SM_TrafficSigns_Destroyed_01b",
-            "/Game/Environment/Props/Exterior/Street/SM_IndPole_03c",
-            "/Game/Environment/Props/Exterior/Structures/SM_MetalTower__01",
-            "/Game/Environment/Props/Dev/plastic_chair_TrailerE3",
-            
-            # Blueprint problems (always filter these)
-            "/Game/Environment/BluePrints/KitSelectionRoom/BP_KitSelectionRoom_Sec",
-            "/Game/Environment/BluePrints/KitSelectionRoom/BP_KitSelectionRoom_Ins"
-        ]
-        
-        # Check for problematic assets
-        for problem in problem_assets:
-            if problem in mesh_path:
-                self.log(f"Skipping problematic asset: {mesh_path}")
-                return True
-        
-        # Skip based on standard keywords (for all assets)
-        standard_skip_keywords = [
-            # Static mesh keywords
-            "Door", "door",           # Any doors
-            "MERGED", "Merged",       # Merged assets
-            "Window", "window",       # Windows that might cause issues
-            "TrafficSign", "trafficsign", # Traffic signs
-            "Sign_", "sign_"          # Other signs
-        ]
-        
-        for keyword in standard_skip_keywords:
-            if keyword in mesh_path:
-                return True
-        
-        # Only check blueprint-specific keywords if not a static mesh path
-        # (Static mesh paths will have '/Game/' but not end with '_C')
-        is_blueprint = not mesh_path.endswith('.SM_') and not "StaticMesh" in mesh_path
-        
-        if is_blueprint:
-            # Blueprint-specific skip keywords - these are applied regardless of the filter_all_blueprints checkbox
-            # These are known to cause issues so we filter them out even if blueprints are generally allowed
-            dangerous_blueprint_keywords = [
-                "/BluePrints/Lights/",    # Any lighting blueprints
-                "BP_FluorescentLight",    # Fluorescent lights
-                "BP_Lantern_",            # Lanterns
-                "BP_LightBulb_",          # Light bulbs
-                "BP_LightFlourescent_",   # Fluorescent lights (alternate spelling)
-                "BP_LightLamp_",          # Light lamps
-                "BP_OilLamp_",            # Oil lamps
-                "BP_StreetLight_",        # Street lights
-                "BP_StreetWallLamp_",     # Street wall lamps
-                "BP_FireBarrel_",         # Fire barrels
-                "KitSelectionRoom",       # Kit selection rooms
-                # Additional very problematic blueprints
-                "BP_Wire",                # Wire blueprints
-                "SplineMeshBase",         # Spline mesh objects
-                "Sidewalk_Splines",       # Sidewalk splines
-                "Alarm_Loudspeaker",      # Alarm objects
-                "VehicleSpawner",         # Vehicle spawners
-            ]
-            
-            for keyword in dangerous_blueprint_keywords:
-                if keyword in mesh_path:
-                    return True
-                    
-        return False
+            self.progress_var.set(0 if cancelled else 100)
+            self.root.after(0, self.conversion_finished)
+            if self.log_file:
+                self.log(f"Full log written to {self.log_file}")
+            self.log_sink.request_close_file()
+    
+    def conversion_finished(self):
+        self.cancel_event = None
+        self.cancel_button.config(state="disabled")
+        self.watch_button.config(state="normal")
+    
+    def toggle_watch(self):
+        if self.watch_stop is not None:
+            self.watch_stop.set()
+            return
+        
+        if self.cancel_event is not None:
+            messagebox.showwarning("Warning", "Wait for the conversion to finish before watching.")
+            return
+        
+        if not self.csv_files:
+            messagebox.showwarning("Warning", "Please add at least one CSV file.")
+            return
+        
+        if not self.output_file:
+            messagebox.showwarning("Warning", "Please select an output file.")
+            return
+        
+        try:
+            options = self.build_options()
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        
+        self.log_sink.clear()
+        self.watch_stop = threading.Event()
+        self.watch_button.config(text="Stop watching")
+        self.convert_button.config(state="disabled")
+        thread = threading.Thread(target=self.watch, args=(self.watch_stop, options))
+        thread.daemon = True
+        thread.start()
+    
+    def watch(self, stop, options):
+        self.status_var.set("Watching CSVs...")
+        if self.write_variants.get():
+            self.log("Watching writes the main output only, not the variants")
+        if options.index_db:
+            self.log("Watching does not write the usage index")
+        
+        try:
+            engine = ConverterEngine(options, log=self.log, detail=self.row_detail(options))
+            CsvWatcher(engine, list(self.csv_files), self.output_file).run(stop)
+            self.status_var.set("Stopped watching")
+        except Exception as e:
+            self.log(f"\nERROR: {e}")
+            self.status_var.set("Error")
+        finally:
+            self.log("Stopped watching")
+            self.root.after(0, self.watch_stopped)
+    
+    def open_index_search(self):
+        path = default_index_path(self.output_file) if self.output_file else ""
+        if not os.path.isfile(path):
+            path = filedialog.askopenfilename(
+                title="Select Usage Index",
+                filetypes=[("Usage Index", "*.usage.db"), ("All Files", "*.*")]
+            )
+        if path:
+            IndexSearchWindow(self.root, path)
+    
+    def watch_stopped(self):
+        self.watch_stop = None
+        self.watch_button.config(text="Watch CSVs and reconvert on change")
+        self.convert_button.config(state="normal")
     
     def log(self, message):
-        """Add message to the log text widget"""
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.log_text.config(state="disabled")
-        # Force update to ensure the UI shows the new message
-        self.root.update_idletasks()
+        """Queue a message for the log widget and log file (safe from any thread)"""
+        self.log_sink.put(message)
 
 if __name__ == "__main__":
     root = tk.Tk()
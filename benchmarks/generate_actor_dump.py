@@ -0,0 +1,144 @@
+"""Generate synthetic Unreal actor dump CSVs for benchmarking.
+
+The rows follow the format described in the README:
+
+    ---,Actor,Location,Rotation,Scale,Meshes
+
+Usage:
+    python benchmarks/generate_actor_dump.py out.csv --rows 100000
+"""
+import argparse
+import random
+
+HEADER = "---,Actor,Location,Rotation,Scale,Meshes\n"
+SCALE = '"(X=1.000000,Y=1.000000,Z=1.000000)"'
+
+# Paths that the built-in filter rules skip
+FILTERED_STATICMESHES = [
+    "/Game/Environment/Props/Exterior/Street/SM_IndPole_03c",
+    "/Game/Environment/Props/Interior/Doors/SM_Door_01a",
+    "/Game/Environment/Props/Exterior/Generic/SM_MERGED_Wall_02",
+    "/Game/Environment/Props/Exterior/Generic/SM_Window_05b",
+    "/Game/Environment/Props/Exterior/Signs/SM_Sign_Shop_03",
+]
+FILTERED_BLUEPRINTS = [
+    "/Game/Environment/BluePrints/Lights/BP_Lantern_01",
+    "/Game/Environment/BluePrints/KitSelectionRoom/BP_KitSelectionRoom_Sec",
+    "/Game/Game/Actors/Breakables/BP_Crate_01",
+    "/Game/Game/Actors/Misc/BP_Wire_03",
+    "/Game/Game/Actors/Vehicles/BP_Truck_02",
+]
+
+# Rotations exported for hand placed props repeat a lot
+COMMON_ROTATIONS = [(p, y, r) for p in (0.0, 0.000007) for y in (0.0, 89.999992, -89.999992, 179.999985, -180.000168)
+                    for r in (0.0, 90.000031)]
+
+
+class DumpSpec:
+    """Shape of a generated actor dump"""
+
+    def __init__(self, rows=10000, blueprint_share=0.25, dynamic_class_share=0.5, unique_staticmeshes=200,
+                 unique_blueprints=30, filtered_share=0.05, origin_share=0.03, malformed_share=0.005,
+                 random_rotation_share=0.15, seed=1):
+        self.rows = rows
+        # Share of rows that are blueprint actors instead of static meshes
+        self.blueprint_share = blueprint_share
+        # Share of blueprint rows written as DynamicClass instead of BlueprintGeneratedClass
+        self.dynamic_class_share = dynamic_class_share
+        self.unique_staticmeshes = unique_staticmeshes
+        self.unique_blueprints = unique_blueprints
+        # Share of rows whose asset matches a built-in filter rule
+        self.filtered_share = filtered_share
+        # Share of rows at location (0,0,0)
+        self.origin_share = origin_share
+        # Share of rows with an unparseable location
+        self.malformed_share = malformed_share
+        # Share of rows with an arbitrary rotation instead of a common one
+        self.random_rotation_share = random_rotation_share
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _format_vector(x, y, z):
+    return f'"(X={x:.6f},Y={y:.6f},Z={z:.6f})"'
+
+
+def iter_rows(spec):
+    """Yield the CSV lines of a dump, header first"""
+    rnd = random.Random(spec.seed)
+    staticmeshes = [f"/Game/Environment/Props/Exterior/Generic/SM_Prop_{i:04d}"
+                    for i in range(spec.unique_staticmeshes)]
+    blueprints = [f"/Game/Game/Actors/Misc/BP_Deco_{i:04d}" for i in range(spec.unique_blueprints)]
+
+    yield HEADER
+    for i in range(spec.rows):
+        roll = rnd.random()
+        if roll < spec.origin_share:
+            location = _format_vector(0.0, 0.0, 0.0)
+        elif roll < spec.origin_share + spec.malformed_share:
+            location = '"(X=1.2.3,Y=0.000000,Z=0.000000)"'
+        else:
+            location = _format_vector(rnd.uniform(-50000, 50000), rnd.uniform(-50000, 50000), rnd.uniform(-1000, 1000))
+
+        if rnd.random() < spec.random_rotation_share:
+            rotation = f'"(Pitch={rnd.uniform(-90, 90):.6f},Yaw={rnd.uniform(-180, 180):.6f},Roll={rnd.uniform(-180, 180):.6f})"'
+        else:
+            pitch, yaw, rot_roll = rnd.choice(COMMON_ROTATIONS)
+            rotation = f'"(Pitch={pitch:.6f},Yaw={yaw:.6f},Roll={rot_roll:.6f})"'
+
+        filtered = rnd.random() < spec.filtered_share
+        if rnd.random() < spec.blueprint_share:
+            path = rnd.choice(FILTERED_BLUEPRINTS if filtered or not blueprints else blueprints)
+            name = path.rsplit('/', 1)[1]
+            kind = "DynamicClass" if rnd.random() < spec.dynamic_class_share else "BlueprintGeneratedClass"
+            actor = f"{kind}'{path}.{name}_C'"
+            meshes = '""'
+        else:
+            path = rnd.choice(FILTERED_STATICMESHES if filtered or not staticmeshes else staticmeshes)
+            name = path.rsplit('/', 1)[1]
+            actor = "Class'/Script/Engine.StaticMeshActor'"
+            meshes = (f"\"((StaticMesh=StaticMesh'{path}.{name}'',Materials=(MaterialInstanceConstant'"
+                      f"\"\"/Game/Environment/Materials/MI_{name}\"\"')))\"")
+
+        yield f"Row_{i},{actor},{location},{rotation},{SCALE},{meshes}\n"
+
+
+def write_dump(path, spec):
+    """Write a dump for spec to path and return its size in bytes"""
+    with open(path, 'w', newline='') as f:
+        f.writelines(iter_rows(spec))
+        return f.tell()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Write a synthetic Unreal actor dump CSV.")
+    parser.add_argument("output", help="CSV file to write")
+    defaults = DumpSpec()
+    parser.add_argument("--rows", type=int, default=defaults.rows)
+    parser.add_argument("--blueprint-share", type=float, default=defaults.blueprint_share)
+    parser.add_argument("--dynamic-class-share", type=float, default=defaults.dynamic_class_share)
+    parser.add_argument("--unique-staticmeshes", type=int, default=defaults.unique_staticmeshes)
+    parser.add_argument("--unique-blueprints", type=int, default=defaults.unique_blueprints)
+    parser.add_argument("--filtered-share", type=float, default=defaults.filtered_share)
+    parser.add_argument("--origin-share", type=float, default=defaults.origin_share)
+    parser.add_argument("--malformed-share", type=float, default=defaults.malformed_share)
+    parser.add_argument("--random-rotation-share", type=float, default=defaults.random_rotation_share)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    spec = DumpSpec(rows=args.rows, blueprint_share=args.blueprint_share,
+                    dynamic_class_share=args.dynamic_class_share, unique_staticmeshes=args.unique_staticmeshes,
+                    unique_blueprints=args.unique_blueprints, filtered_share=args.filtered_share,
+                    origin_share=args.origin_share, malformed_share=args.malformed_share,
+                    random_rotation_share=args.random_rotation_share, seed=args.seed)
+    size = write_dump(args.output, spec)
+    print(f"Wrote {spec.rows} rows ({size} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark the converter on synthetic actor dumps.
+
+Each measurement runs in a fresh subprocess so peak RSS belongs to that run
+alone. Results are printed as a table and can be saved as JSON and compared
+with an earlier run:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+MODES = ("process_csv", "convert")
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_child(mode, csv_file, output_file, workers, streaming):
+    """Time one mode in this process and return the measurement dict"""
+    sys.path.insert(0, REPO_DIR)
+    from customobjects import ConversionOptions, ConverterEngine
+
+    options = ConversionOptions(workers=workers, streaming=streaming)
+    # Stubbed log so console output doesn't distort the timing
+    engine = ConverterEngine(options, log=lambda message: None)
+
+    start = time.perf_counter()
+    if mode == "process_csv":
+        included = engine.process_csv(csv_file, "Scenario_Benchmark", {}, {}, [])
+        output_bytes = None
+    else:
+        included = engine.convert([(csv_file, "Scenario_Benchmark")], output_file)
+        output_bytes = os.path.getsize(output_file)
+    seconds = time.perf_counter() - start
+
+    return {"seconds": seconds, "included": included, "output_bytes": output_bytes, "peak_rss": peak_rss_bytes()}
+
+
+def measure(mode, csv_file, rows, work_dir, workers, streaming):
+    output_file = os.path.join(work_dir, f"bench_{rows}.ini")
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, csv_file, output_file,
+               "--workers", str(workers)]
+    if streaming:
+        command.append("--streaming")
+    completed = subprocess.run(command, check=True, stdout=subprocess.PIPE, universal_newlines=True)
+    result = json.loads(completed.stdout)
+    result.update(mode=mode, rows=rows, rows_per_sec=rows / result["seconds"] if result["seconds"] else None)
+    return result
+
+
+def load_previous(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {(r["mode"], r["rows"]): r for r in data["results"]}
+
+
+def format_mb(value):
+    return "-" if value is None else f"{value / (1024 * 1024):.1f}"
+
+
+def print_result(result, previous=None):
+    line = (f"{result['mode']:<12} {result['rows']:>9} rows  {result['seconds']:8.2f}s  "
+            f"{result['rows_per_sec']:>10.0f} rows/s  peak RSS {format_mb(result['peak_rss']):>7} MB  "
+            f"output {format_mb(result['output_bytes']):>7} MB")
+    before = previous.get((result["mode"], result["rows"])) if previous else None
+    if before and before.get("rows_per_sec"):
+        line += f"  ({result['rows_per_sec'] / before['rows_per_sec']:.2f}x vs previous)"
+    print(line, flush=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark CustomObjects conversions on synthetic CSVs.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma separated row counts (default %(default)s)")
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the conversion")
+    parser.add_argument("--streaming", action="store_true", help="use the low memory mode")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", help="keep the generated CSVs here and reuse them on later runs")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare rows/sec with")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "CSV", "INI"), help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.child:
+        mode, csv_file, output_file = args.child
+        print(json.dumps(run_child(mode, csv_file, output_file, args.workers, args.streaming)))
+        return 0
+
+    from generate_actor_dump import DumpSpec, write_dump
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    modes = MODES if args.mode == "all" else (args.mode,)
+    previous = load_previous(args.compare) if args.compare else None
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="customobjects-bench-") as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        specs = []
+        for rows in sizes:
+            spec = DumpSpec(rows=rows, seed=args.seed)
+            specs.append(spec.to_dict())
+            csv_file = os.path.join(data_dir, f"actor_dump_{rows}_seed{args.seed}.csv")
+            if not os.path.isfile(csv_file):
+                print(f"Generating {rows} rows...", flush=True)
+                write_dump(csv_file, spec)
+            for mode in modes:
+                result = measure(mode, csv_file, rows, tmp_dir, args.workers, args.streaming)
+                result["csv_bytes"] = os.path.getsize(csv_file)
+                results.append(result)
+                print_result(result, previous)
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {"workers": args.workers, "streaming": args.streaming},
+            "specs": specs,
+            "results": results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""CustomObjects converter: Unreal actor dump CSVs to CustomObjects INI configs."""
+from .engine import (
+    ConversionOptions,
+    ConverterEngine,
+    OutputProfile,
+    default_scenario_name,
+    format_config_entry,
+    variant_profiles,
+)
+
+__all__ = [
+    "ConversionOptions",
+    "ConverterEngine",
+    "OutputProfile",
+    "default_scenario_name",
+    "format_config_entry",
+    "variant_profiles",
+]
@@ -0,0 +1,242 @@
+"""Per-scenario placement budgets: areas to keep and entry caps.
+
+Budgets are read from a JSON file keyed on scenario name; "*" applies to
+every scenario without its own entry. Example:
+
+    {"scenarios": {
+        "Scenario_Precinct_Push_Security": {
+            "bounds": {"min": [-40000, -40000], "max": [40000, 40000]},
+            "keep_near": [{"point": [1200, -800, 0], "radius": 15000}],
+            "max_entries": 20000,
+            "max_per_asset": 500,
+            "max_per_type": {"Blueprint": 1000}
+        },
+        "*": {"max_entries": 30000}
+    }}
+
+"bounds" and "keep_near" points take [x, y] or [x, y, z]; with two values
+the height is ignored. A placement must be inside the bounds (if given)
+and within the radius of at least one point (if given). Caps are applied
+in input order, so when a budget is exceeded the first placements of the
+CSVs are kept and the result is the same on every run.
+"""
+import json
+from collections import Counter
+
+# Reasons a placement is culled, in the order they are checked
+CULL_OUTSIDE_BOUNDS = "outside_bounds"
+CULL_NOT_NEAR = "not_near_points"
+CULL_ASSET_CAP = "max_per_asset"
+CULL_TYPE_CAP = "max_per_type"
+CULL_SCENARIO_CAP = "max_entries"
+
+CULL_LABELS = {
+    CULL_OUTSIDE_BOUNDS: "Outside bounds",
+    CULL_NOT_NEAR: "Not near a keep point",
+    CULL_ASSET_CAP: "Over the per-asset cap",
+    CULL_TYPE_CAP: "Over the per-type cap",
+    CULL_SCENARIO_CAP: "Over the scenario cap",
+}
+
+DEFAULT_SCENARIO = "*"
+
+_NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+def _vector(value, what):
+    if not isinstance(value, list) or len(value) not in (2, 3) \
+            or not all(isinstance(v, (int, float)) for v in value):
+        raise ValueError(f"{what} must be a list of 2 or 3 numbers, got {value!r}")
+    return [float(v) for v in value]
+
+
+def _count(value, what):
+    if value is None:
+        return None
+    if not isinstance(value, int) or value < 0:
+        raise ValueError(f"{what} must be a non-negative integer, got {value!r}")
+    return value
+
+
+class KeepPoints:
+    """Points with a radius, bucketed in a 2D grid of the largest radius"""
+
+    def __init__(self, points):
+        # (x, y, z or None, radius squared)
+        self.points = points
+        self.cell_size = max(radius for _, _, _, radius in points) or 1.0
+        self._grid = {}
+        for x, y, z, radius in points:
+            key = (int(x // self.cell_size), int(y // self.cell_size))
+            self._grid.setdefault(key, []).append((x, y, z, radius * radius))
+
+    def contains(self, x, y, z):
+        """True if (x, y, z) is within the radius of any point"""
+        cx = int(x // self.cell_size)
+        cy = int(y // self.cell_size)
+        grid = self._grid
+        for dx, dy in _NEIGHBOURS:
+            for px, py, pz, radius2 in grid.get((cx + dx, cy + dy), ()):
+                distance2 = (x - px) ** 2 + (y - py) ** 2
+                if pz is not None:
+                    distance2 += (z - pz) ** 2
+                if distance2 <= radius2:
+                    return True
+        return False
+
+
+class ScenarioBudget:
+    """Area and caps for one scenario"""
+
+    def __init__(self, bounds=None, keep_near=None, max_entries=None, max_per_asset=None, max_per_type=None):
+        # (min, max) corners, each [x, y] or [x, y, z]
+        self.bounds = bounds
+        self.keep_near = keep_near
+        self.max_entries = max_entries
+        self.max_per_asset = max_per_asset
+        # config entry Type ("Blueprint"/"StaticMesh") -> cap
+        self.max_per_type = max_per_type or {}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        if not isinstance(data, dict):
+            raise ValueError(f"Budget for {name!r} must be an object")
+        unknown = set(data) - {"bounds", "keep_near", "max_entries", "max_per_asset", "max_per_type"}
+        if unknown:
+            raise ValueError(f"Budget for {name!r} has unknown keys: {', '.join(sorted(unknown))}")
+
+        bounds = None
+        if data.get("bounds") is not None:
+            try:
+                low = _vector(data["bounds"]["min"], f"{name} bounds min")
+                high = _vector(data["bounds"]["max"], f"{name} bounds max")
+            except (KeyError, TypeError):
+                raise ValueError(f"Budget for {name!r}: bounds needs 'min' and 'max'")
+            bounds = (low, high)
+
+        keep_near = None
+        if data.get("keep_near"):
+            points = []
+            for item in data["keep_near"]:
+                try:
+                    point = _vector(item["point"], f"{name} keep_near point")
+                    radius = float(item["radius"])
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ValueError(f"Budget for {name!r}: invalid keep_near entry {item!r} ({e})")
+                if not radius > 0:
+                    raise ValueError(f"Budget for {name!r}: keep_near radius must be positive, got {item['radius']!r}")
+                points.append((point[0], point[1], point[2] if len(point) == 3 else None, radius))
+            keep_near = KeepPoints(points)
+
+        max_per_type = {}
+        for entry_type, cap in (data.get("max_per_type") or {}).items():
+            if entry_type not in ("Blueprint", "StaticMesh"):
+                raise ValueError(f"Budget for {name!r}: max_per_type keys are Blueprint and StaticMesh")
+            max_per_type[entry_type] = _count(cap, f"{name} max_per_type {entry_type}")
+
+        return cls(bounds, keep_near, _count(data.get("max_entries"), f"{name} max_entries"),
+                   _count(data.get("max_per_asset"), f"{name} max_per_asset"), max_per_type)
+
+    def cull_reason(self, x, y, z):
+        """Reason a location is outside the area to keep, or None"""
+        if self.bounds is not None:
+            low, high = self.bounds
+            if not (low[0] <= x <= high[0] and low[1] <= y <= high[1]):
+                return CULL_OUTSIDE_BOUNDS
+            if len(low) == 3 and len(high) == 3 and not low[2] <= z <= high[2]:
+                return CULL_OUTSIDE_BOUNDS
+        if self.keep_near is not None and not self.keep_near.contains(x, y, z):
+            return CULL_NOT_NEAR
+        return None
+
+
+class BudgetSet:
+    """Scenario budgets loaded from JSON"""
+
+    def __init__(self, budgets):
+        # scenario name (or "*") -> ScenarioBudget
+        self.budgets = budgets
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"Could not parse budgets file {path}: {e}")
+        scenarios = data.get("scenarios") if isinstance(data, dict) else None
+        if not isinstance(scenarios, dict):
+            raise ValueError("Budgets must be an object with a 'scenarios' object")
+        return cls({name: ScenarioBudget.from_dict(name, budget) for name, budget in scenarios.items()})
+
+    def for_scenario(self, scenario):
+        return self.budgets.get(scenario, self.budgets.get(DEFAULT_SCENARIO))
+
+
+class PlacementCuller:
+    """Wraps a config entry list (or spool) and drops placements over budget"""
+
+    def __init__(self, target, budget_set):
+        self.target = target
+        self.budget_set = budget_set
+        # Kept counts per scenario, per (scenario, type) and per (scenario, type, index)
+        self._entries = Counter()
+        self._types = Counter()
+        self._assets = Counter()
+        # (scenario, reason) -> placements culled
+        self.culled = Counter()
+        # (type, index) of the assets with a placement kept, and with one culled
+        self._kept_assets = set()
+        self._culled_assets = set()
+
+    def append(self, entry):
+        scenario = entry['Scenario']
+        budget = self.budget_set.for_scenario(scenario)
+        if budget is None:
+            self._kept_assets.add((entry['Type'], entry['AssetIndex']))
+            self.target.append(entry)
+            return
+
+        reason = None
+        if budget.bounds is not None or budget.keep_near is not None:
+            x, y, z = entry['Location']
+            reason = budget.cull_reason(x, y, z)
+
+        entry_type = entry['Type']
+        asset = (scenario, entry_type, entry['AssetIndex'])
+        if reason is None and budget.max_per_asset is not None and self._assets[asset] >= budget.max_per_asset:
+            reason = CULL_ASSET_CAP
+        type_cap = budget.max_per_type.get(entry_type)
+        if reason is None and type_cap is not None and self._types[scenario, entry_type] >= type_cap:
+            reason = CULL_TYPE_CAP
+        if reason is None and budget.max_entries is not None and self._entries[scenario] >= budget.max_entries:
+            reason = CULL_SCENARIO_CAP
+
+        if reason is not None:
+            self.culled[scenario, reason] += 1
+            self._culled_assets.add((entry_type, entry['AssetIndex']))
+            return
+        self._entries[scenario] += 1
+        self._types[scenario, entry_type] += 1
+        self._assets[asset] += 1
+        self._kept_assets.add((entry_type, entry['AssetIndex']))
+        self.target.append(entry)
+
+    def __len__(self):
+        return len(self.target)
+
+    @property
+    def total_culled(self):
+        return sum(self.culled.values())
+
+    @property
+    def unplaced_assets(self):
+        """Assets that had every placement culled; they stay in the asset tables"""
+        return len(self._culled_assets - self._kept_assets)
+
+    def culled_by_scenario(self):
+        """scenario -> {reason: count}"""
+        result = {}
+        for (scenario, reason), count in self.culled.items():
+            result.setdefault(scenario, {})[reason] = count
+        return result
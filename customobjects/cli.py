@@ -0,0 +1,247 @@
+"""Command line entry point: python -m customobjects"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from .engine import (
+    DEFAULT_CHUNK_SIZE,
+    ConversionOptions,
+    ConverterEngine,
+    OutputProfile,
+    default_scenario_name,
+    variant_profiles,
+)
+from .filter_rules import load_rule_set
+from .result_cache import DEFAULT_CACHE_SIZE
+from .usage_index import find_assets, find_skipped, run_query, scenario_usage
+from .watch import DEFAULT_DEBOUNCE, CsvWatcher
+
+
+def parse_csv_argument(value):
+    """Split a 'csv:scenario' argument into a (csv_path, scenario) tuple
+
+    The scenario part is optional and defaults to the GUI's Scenario_<name>.
+    Only the last colon is considered so Windows drive letters still work.
+    """
+    path, sep, scenario = value.rpartition(':')
+    if not sep or not path or '/' in scenario or '\\' in scenario:
+        path, scenario = value, ""
+    return path, scenario or default_scenario_name(path)
+
+
+def print_table(columns, rows):
+    """Print rows as tab separated columns under a header line"""
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if value is None else str(value) for value in row))
+
+
+def query_index(args):
+    """Print the answers to the --find, --find-index, --find-skipped and --sql queries"""
+    path = args.index_db
+    if args.find is not None or args.find_index is not None:
+        rows = find_assets(path, args.find or "", args.find_index)
+        print_table(["type", "index", "path", "first_file", "scenarios", "placements"], rows)
+        if args.find_index is not None:
+            for entry_type, index, *_ in rows:
+                print(f"\n{entry_type} {index} by scenario:")
+                print_table(["scenario", "placements"], scenario_usage(path, entry_type, index))
+    if args.find_skipped is not None:
+        print_table(["rule", "path", "rows", "scenarios"], find_skipped(path, args.find_skipped))
+    if args.sql:
+        print_table(*run_query(path, args.sql))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="customobjects",
+        description="Convert Unreal actor dump CSVs to a CustomObjects INI without the GUI."
+    )
+    parser.add_argument("inputs", nargs="*", metavar="CSV[:SCENARIO]",
+                        help="CSV file, optionally followed by ':' and the scenario name")
+    parser.add_argument("-o", "--output", help="output INI file")
+    parser.add_argument("--no-once", action="store_true",
+                        help="do not add the 'Once' parameter to Blueprint assets")
+    parser.add_argument("--staticmesh-only", action="store_true",
+                        help="filter out ALL Blueprint assets")
+    parser.add_argument("--variant", action="append", default=[], metavar="PROFILE=INI",
+                        help="also write INI with profile once, no-once or staticmesh-only from the same parse "
+                             "(repeatable)")
+    parser.add_argument("--variants", action="store_true",
+                        help="write the _Once, _NoOnce and _StaticMeshOnly variants of --output in one pass")
+    parser.add_argument("--shard-dir", metavar="DIR",
+                        help="also write one INI per scenario into DIR (-o is then optional)")
+    parser.add_argument("--update", action="store_true",
+                        help="update --output in place, parsing only scenarios whose CSVs changed and keeping "
+                             "existing asset indices")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rewrite --output whenever a CSV changes, parsing only what changed")
+    parser.add_argument("--watch-dir", metavar="DIR",
+                        help="with --watch, also convert every CSV (also .csv.gz etc.) in DIR, even ones added later")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, metavar="SECONDS",
+                        help="with --watch, wait until the CSVs were quiet this long before rewriting "
+                             "(default %(default)s)")
+    parser.add_argument("--index-db", metavar="FILE",
+                        help="also write a SQLite index of asset usage, placements and skipped assets to FILE; "
+                             "with --find, --find-index, --find-skipped or --sql, query FILE instead")
+    parser.add_argument("--find", metavar="TEXT",
+                        help="list indexed assets whose path contains TEXT with their scenarios and placements")
+    parser.add_argument("--find-index", type=int, metavar="N",
+                        help="list the indexed assets with asset index N and the scenarios using them")
+    parser.add_argument("--find-skipped", metavar="TEXT",
+                        help="list skipped assets whose path contains TEXT and the rule that skipped them")
+    parser.add_argument("--sql", metavar="QUERY", help="run a read-only SQL query on the index")
+    parser.add_argument("--preview", action="store_true",
+                        help="estimate placements, rule hits and output size from a sample of each CSV; "
+                             "nothing is written")
+    parser.add_argument("--sample-mb", type=float, default=4, metavar="MB",
+                        help="with --preview, MB of CSV rows to sample over all files (default %(default)s)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="spool entries to a temporary file to keep memory use low")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="parse with N worker processes (0 = one per CPU, default 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024), metavar="MB",
+                        help="split CSVs larger than this between workers (default %(default)s MB)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="drop repeated placements of the same asset at the same location and rotation")
+    parser.add_argument("--dedupe-tolerance", type=int, default=0, metavar="UNITS",
+                        help="with --dedupe, also drop placements within UNITS on every axis of a kept one")
+    parser.add_argument("--budgets", metavar="JSON",
+                        help="per-scenario areas and entry caps to cull placements with")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help="asset listing of the server build (e.g. a pak file listing); assets not in it are "
+                             "skipped and listed at the end")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="reuse parse results of unchanged CSVs from this cache directory")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE // (1024 * 1024), metavar="MB",
+                        help="size cap of the cache directory (default %(default)s MB)")
+    parser.add_argument("--rules", metavar="JSON",
+                        help="filter rule set to use instead of the built-in rules")
+    parser.add_argument("--dump-rules", action="store_true",
+                        help="print the filter rule set as JSON and exit")
+    parser.add_argument("--report", action="store_true",
+                        help="write a JSON run report with stage timings next to the output")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the run with cProfile and save the stats to FILE")
+    parser.add_argument("--collapse", action="store_true",
+                        help="print per-row messages as counts at the end of each file")
+    parser.add_argument("--progress", action="store_true",
+                        help="show the progress, rows/s and ETA on stderr while parsing")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.dump_rules:
+        try:
+            rules = load_rule_set(args.rules)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        print(json.dumps(rules.to_data(), indent=2))
+        return 0
+
+    if args.find is not None or args.find_index is not None or args.find_skipped is not None or args.sql:
+        if not args.index_db:
+            parser.error("--find, --find-index, --find-skipped and --sql need --index-db")
+        try:
+            query_index(args)
+        except (OSError, sqlite3.Error) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.watch_dir and not args.watch:
+        parser.error("--watch-dir needs --watch")
+    if args.preview:
+        if not args.inputs:
+            parser.error("--preview needs at least one CSV")
+    elif not (args.inputs or args.watch_dir) or not (args.output or args.variant or args.shard_dir):
+        parser.error("at least one CSV and --output, --shard-dir or --variant are required")
+    if args.variants and not args.output:
+        parser.error("--variants needs --output")
+    if args.update and (not args.output or args.variants or args.variant or args.shard_dir):
+        parser.error("--update needs --output and cannot be combined with variants or --shard-dir")
+    if args.watch and (not args.output or args.variants or args.variant or args.update):
+        parser.error("--watch needs --output and cannot be combined with variants or --update")
+    if args.index_db and (args.update or args.watch):
+        parser.error("--index-db cannot be combined with --update or --watch")
+
+    profiles = []
+    try:
+        for value in args.variant:
+            name, sep, path = value.partition('=')
+            if not sep or not path:
+                raise ValueError(f"--variant expects PROFILE=INI, got {value!r}")
+            profiles.append(OutputProfile.preset(name, path))
+    except ValueError as e:
+        parser.error(str(e))
+
+    csv_files = [parse_csv_argument(value) for value in args.inputs]
+    for csv_file, _ in csv_files:
+        if not os.path.isfile(csv_file):
+            print(f"ERROR: CSV file not found: {csv_file}", file=sys.stderr)
+            return 2
+
+    options = ConversionOptions(
+        add_once_to_blueprints=not args.no_once,
+        filter_all_blueprints=args.staticmesh_only,
+        rules_file=args.rules,
+        streaming=args.streaming,
+        collapse_row_messages=args.collapse,
+        workers=args.jobs if args.jobs > 0 else (os.cpu_count() or 1),
+        chunk_size=args.chunk_size * 1024 * 1024,
+        cache_dir=args.cache,
+        cache_size=args.cache_size * 1024 * 1024,
+        run_report=args.report,
+        profile_file=args.profile,
+        dedupe=args.dedupe,
+        dedupe_tolerance=args.dedupe_tolerance,
+        budgets_file=args.budgets,
+        shard_dir=args.shard_dir,
+        index_db=args.index_db,
+        manifest_file=args.manifest,
+    )
+    log = (lambda message: None) if args.quiet else None
+    detail = (lambda kind, message: None) if args.collapse else None
+    status = None
+    if args.progress:
+        status = lambda text: print(f"\r{text:<60}", end="", file=sys.stderr, flush=True)
+
+    try:
+        engine = ConverterEngine(options, log=log, detail=detail, status=status)
+        if args.preview:
+            for line in engine.preview(csv_files, int(args.sample_mb * 1024 * 1024)).lines():
+                print(line)
+            return 0
+        if args.update:
+            engine.update(csv_files, args.output)
+            return 0
+        if args.watch:
+            watcher = CsvWatcher(engine, csv_files, args.output, args.watch_dir, debounce=args.debounce)
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                pass
+            return 0
+        if args.variants:
+            profiles = variant_profiles(args.output, args.shard_dir) + profiles
+        elif args.output or args.shard_dir:
+            profiles.insert(0, OutputProfile(args.output, options.add_once_to_blueprints,
+                                             options.filter_all_blueprints, shard_dir=args.shard_dir))
+        engine.convert_profiles(csv_files, profiles)
+    except KeyboardInterrupt:
+        print("\nCancelled, output not written", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if status is not None:
+            print(file=sys.stderr)
+    return 0
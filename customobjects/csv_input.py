@@ -0,0 +1,164 @@
+"""Reading actor dump CSVs, either whole or one byte range at a time.
+
+Byte ranges let several workers share one large export. A row belongs to
+the range that contains its first byte, so adjacent ranges never parse a
+row twice. Rows must not contain embedded newlines, which Unreal actor
+dumps never do.
+
+Exports archived as .gz, .bz2 or .xz/.lzma are decompressed while they
+are read, so rows stream without the file ever being unpacked to disk.
+The encoding comes from the byte order mark when there is one (UTF-8 or
+the UTF-16 some exports use) and is the platform default otherwise, as
+with a plain open(). Compressed and UTF-16 files can't be positioned on
+a line by byte offset, so they are always read whole.
+"""
+import bz2
+import contextlib
+import csv
+import gzip
+import io
+import locale
+import lzma
+import os
+
+# Extension -> function wrapping a binary file object in a decompressing one
+COMPRESSED_FORMATS = {
+    ".gz": lambda f: gzip.GzipFile(fileobj=f, mode='rb'),
+    ".bz2": lambda f: bz2.BZ2File(f, 'rb'),
+    ".xz": lambda f: lzma.LZMAFile(f, 'rb'),
+    ".lzma": lambda f: lzma.LZMAFile(f, 'rb'),
+}
+
+# File name patterns of the inputs the converter reads
+CSV_PATTERNS = ("*.csv",) + tuple(f"*.csv{ext}" for ext in COMPRESSED_FORMATS)
+
+# Read buffer for CSV input; large reads keep the system calls down
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Byte order mark -> encoding, longest first
+_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+
+def compression_of(csv_file):
+    """Decompressing wrapper for csv_file, or None if it is not compressed"""
+    return COMPRESSED_FORMATS.get(os.path.splitext(csv_file)[1].lower())
+
+
+def csv_stem(csv_file):
+    """File name without the compression and .csv extensions"""
+    name = os.path.basename(csv_file)
+    if compression_of(name) is not None:
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def bom_encoding(data):
+    """Encoding named by the byte order mark data starts with, or None"""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    return None
+
+
+def file_encoding(csv_file):
+    """Encoding to decode csv_file with: from its BOM, or the platform default"""
+    with _open_binary(csv_file) as f:
+        head = f.read(4)
+    return bom_encoding(head) or locale.getpreferredencoding(False)
+
+
+def supports_ranges(csv_file):
+    """True if csv_file can be read in byte ranges (plain and not UTF-16)"""
+    return compression_of(csv_file) is None and not file_encoding(csv_file).startswith("utf-16")
+
+
+@contextlib.contextmanager
+def _open_binary(csv_file):
+    """Open csv_file for binary reading, decompressing it if needed
+
+    Yields a buffered reader; its raw attribute is the file on disk.
+    """
+    with open(csv_file, 'rb', buffering=READ_BUFFER_SIZE) as raw:
+        decompress = compression_of(csv_file)
+        if decompress is None:
+            yield raw
+            return
+        with decompress(raw) as stream:
+            buffered = io.BufferedReader(stream, READ_BUFFER_SIZE)
+            buffered.raw_file = raw
+            yield buffered
+
+
+@contextlib.contextmanager
+def open_csv_rows(csv_file, start=0, end=None):
+    """Yield a csv.reader over the data rows starting in [start, end)
+
+    end=None reads to the end of the file. The header row is skipped.
+    """
+    with open_csv_source(csv_file, start, end) as (reader, _):
+        yield reader
+
+
+@contextlib.contextmanager
+def open_csv_source(csv_file, start=0, end=None):
+    """Like open_csv_rows, but yield (reader, tell)
+
+    tell() returns the byte offset in the file up to which rows have been
+    read, to within one read buffer; it is cheap enough to call per batch.
+    """
+    if start == 0 and end is None:
+        with _open_binary(csv_file) as binary:
+            encoding = bom_encoding(binary.peek(4)) or locale.getpreferredencoding(False)
+            # Decoded the same way open(csv_file, 'r') would
+            f = io.TextIOWrapper(binary, encoding=encoding)
+            reader = csv.reader(f)
+            _skip_header(reader, csv_file)
+            # Position in the file on disk, compressed or not; the text
+            # layer reads ahead from the binary buffer in chunks
+            yield reader, getattr(binary, "raw_file", binary).tell
+        return
+
+    if not supports_ranges(csv_file):
+        raise ValueError(f"{csv_file} is compressed or UTF-16 and can only be read whole")
+    # Binary mode so the range can be positioned exactly, decoded the same
+    # way open(csv_file, 'r') would
+    encoding = file_encoding(csv_file)
+    with open(csv_file, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        reader = csv.reader(iter_line_range(f, start, end, encoding))
+        if start == 0:
+            _skip_header(reader, csv_file)
+        yield reader, f.tell
+
+
+def _skip_header(reader, csv_file):
+    if next(reader, None) is None:
+        raise ValueError(f"{csv_file} is empty")
+
+
+def iter_line_range(f, start, end, encoding):
+    """Yield the decoded lines of binary file f that start in [start, end)"""
+    if start > 0:
+        # Finish the line that straddles start; it belongs to the previous range
+        f.seek(start - 1)
+        f.readline()
+    pos = f.tell()
+    for line in f:
+        if end is not None and pos >= end:
+            break
+        pos += len(line)
+        yield line.decode(encoding)
+
+
+def split_ranges(size, chunk_size):
+    """Split a file of size bytes into (start, end) ranges of about chunk_size
+
+    The last range has end=None so rows appended later are still read.
+    """
+    if chunk_size <= 0 or size <= chunk_size:
+        return [(0, None)]
+    starts = list(range(0, size, chunk_size))
+    return [(start, start + chunk_size) for start in starts[:-1]] + [(starts[-1], None)]
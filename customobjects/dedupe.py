@@ -0,0 +1,68 @@
+"""Collapsing of duplicate placements before they are written.
+
+Overlapping sublevels, or the same map exported into two CSVs, list the
+same asset at the same spot more than once and the game would spawn every
+copy. PlacementDeduper sits between the parser and the config entry list
+and drops a placement when an earlier one of the same scenario, type,
+asset index and rotation is at the same location, or with a tolerance
+within that many units on every axis.
+
+Near-duplicates are found with a hash grid of tolerance-sized cells, so
+each placement is only compared with the kept placements in its own and
+the neighbouring cells instead of with every other placement. Placements
+are only compared with kept ones, so the first placement of a cluster
+wins and the output order is otherwise unchanged.
+"""
+from collections import Counter
+
+_NEIGHBOURS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+
+class PlacementDeduper:
+    """Wraps a config entry list (or spool) and drops duplicate placements"""
+
+    def __init__(self, target, tolerance=0):
+        self.target = target
+        self.tolerance = max(0, int(tolerance))
+        # Exact mode: (scenario, type, index, rotation, location) of kept placements
+        self._seen = set()
+        # Near mode: (scenario, type, index, rotation, cell) -> kept (x, y, z)
+        self._grid = {}
+        # scenario -> placements dropped
+        self.collapsed = Counter()
+
+    def append(self, entry):
+        if self.tolerance:
+            duplicate = self._near_duplicate(entry)
+        else:
+            key = (entry['Scenario'], entry['Type'], entry['AssetIndex'], entry['Rotation'], entry['Location'])
+            duplicate = key in self._seen
+            if not duplicate:
+                self._seen.add(key)
+
+        if duplicate:
+            self.collapsed[entry['Scenario']] += 1
+        else:
+            self.target.append(entry)
+
+    def _near_duplicate(self, entry):
+        x, y, z = entry['Location']
+        tolerance = self.tolerance
+        cx, cy, cz = x // tolerance, y // tolerance, z // tolerance
+        group = (entry['Scenario'], entry['Type'], entry['AssetIndex'], entry['Rotation'])
+        grid = self._grid
+
+        for dx, dy, dz in _NEIGHBOURS:
+            for kx, ky, kz in grid.get((group, cx + dx, cy + dy, cz + dz), ()):
+                if abs(kx - x) <= tolerance and abs(ky - y) <= tolerance and abs(kz - z) <= tolerance:
+                    return True
+
+        grid.setdefault((group, cx, cy, cz), []).append((x, y, z))
+        return False
+
+    def __len__(self):
+        return len(self.target)
+
+    @property
+    def total_collapsed(self):
+        return sum(self.collapsed.values())
@@ -0,0 +1,1191 @@
+"""Headless conversion engine for CustomObjects configs.
+
+Everything in here runs without Tkinter so it can be driven from the GUI,
+from the command line or from other scripts.
+"""
+import contextlib
+import copy
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import islice
+
+from . import row_parser
+from .budgets import CULL_LABELS, BudgetSet, PlacementCuller
+from .csv_input import csv_stem, open_csv_source
+from .dedupe import PlacementDeduper
+from .filter_rules import SCOPE_BLUEPRINT_ACTOR, load_rule_set
+from .placements import PlacementStore
+from .progress import ConversionCancelled, ProgressTracker
+from .result_cache import DEFAULT_CACHE_SIZE, ResultCache
+from .run_report import StageTimings, build_run_report, report_path, write_run_report
+
+INI_SECTION = "[/CustomObjects/Mutators/CustomObjects.CustomObjects_C]"
+
+# Buffer size for output files and spooled copies
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Byte range size for splitting large CSVs between parallel workers
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Rows read and location-parsed together by _process_rows
+ROW_BATCH_SIZE = 4096
+
+
+def default_scenario_name(csv_file):
+    """Default scenario name for a CSV: the file name without extension"""
+    return f"Scenario_{csv_stem(csv_file)}"
+
+
+# Read once, os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def new_file_mode(path):
+    """Permission bits for a file replacing path: those of path, or the umask default"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode='w', buffering=-1, keep_unchanged=False):
+    """Open a temporary file next to path and rename it over path on success
+
+    If the block raises, path is left as it was and the temporary file is
+    removed, so an interrupted write never leaves a partial file behind.
+    With keep_unchanged, path is not replaced (and keeps its timestamp)
+    when the new content is the same.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".customobjects-",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, buffering=buffering) as f:
+            yield f
+        if keep_unchanged and os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return
+        os.chmod(tmp_path, new_file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _print_log(message):
+    print(message, flush=True)
+
+
+class ConversionOptions:
+    """Plain options for a conversion run"""
+
+    def __init__(self, add_once_to_blueprints=True, filter_all_blueprints=False, rules_file=None,
+                 streaming=False, collapse_row_messages=False, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                 cache_dir=None, cache_size=DEFAULT_CACHE_SIZE, run_report=False, profile_file=None,
+                 dedupe=False, dedupe_tolerance=0, budgets_file=None, shard_dir=None, index_db=None,
+                 manifest_file=None):
+        self.add_once_to_blueprints = add_once_to_blueprints
+        self.filter_all_blueprints = filter_all_blueprints
+        # JSON filter rule set; None uses the built-in rules
+        self.rules_file = rules_file
+        # Spool Configs= lines to a temporary file instead of keeping them in memory
+        self.streaming = streaming
+        # Log per-row message counts at the end of each file
+        self.collapse_row_messages = collapse_row_messages
+        # Worker processes for parsing; 1 parses in this process
+        self.workers = workers
+        # Files larger than this are split into byte ranges for the workers
+        self.chunk_size = chunk_size
+        # Directory of cached parse results; None parses every CSV again
+        self.cache_dir = cache_dir
+        # Size cap of the cache directory in bytes
+        self.cache_size = cache_size
+        # Write a JSON run report with stage timings next to the output
+        self.run_report = run_report
+        # Profile the run with cProfile and save the stats to this file
+        self.profile_file = profile_file
+        # Drop repeated placements of the same asset at the same location
+        self.dedupe = dedupe
+        # Also drop placements within this many units on every axis of a kept one
+        self.dedupe_tolerance = dedupe_tolerance
+        # JSON per-scenario placement budgets; None keeps every placement
+        self.budgets_file = budgets_file
+        # Also write one INI per scenario into this directory
+        self.shard_dir = shard_dir
+        # Write a SQLite asset usage index of the (first) output to this file
+        self.index_db = index_db
+        # Text listing of the assets the server ships; assets not in it are skipped
+        self.manifest_file = manifest_file
+
+
+# Per-row message kinds and how they are labelled when collapsed into counts
+ROW_MESSAGE_LABELS = {
+    "include_blueprint": "Including blueprint",
+    "skip_blueprint": "Skipping possibly problematic blueprint",
+    "skip_problem": "Skipping problematic asset",
+    "row_error": "Errors processing rows",
+}
+
+# Marks a cache slot that has not been decided yet
+_MISSING = object()
+
+
+class AssetDecision:
+    """The parsed path of a raw CSV cell and whether it is kept"""
+
+    __slots__ = ("path", "rule", "index", "filtered")
+
+    def __init__(self, path, rule=None, index=None, filtered=False):
+        self.path = path
+        # Filter rule that skipped the asset, if any
+        self.rule = rule
+        # Asset index when the asset is kept, otherwise None
+        self.index = index
+        # Skipped because all blueprints are filtered out
+        self.filtered = filtered
+
+
+class DecisionCache:
+    """Per-run cache of asset decisions keyed on the raw CSV cells
+
+    The same StaticMesh'...' or BlueprintGeneratedClass'...' cell repeats
+    thousands of times in one export, so parsing, filtering and index
+    lookup happen once per unique cell instead of once per row.
+    """
+
+    # Rotation cells are less repetitive than asset cells, so bound them
+    MAX_ROTATIONS = 65536
+
+    def __init__(self):
+        self.actors = {}  # raw actor cell -> AssetDecision, None when not a blueprint
+        self.meshes = {}  # raw meshes cell -> AssetDecision
+        self.rotations = {}  # raw rotation cell -> (roll, pitch, yaw)
+        self.hits = 0
+        self.misses = 0
+        # Set when the counts come from merged ParseResults, whose cells
+        # were cached per work unit and are not in this cache
+        self.merged = False
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        if self.merged:
+            return f"Asset decision cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+        return (f"Asset decision cache: {self.hits} hits, {self.misses} misses "
+                f"({rate:.1f}% hit rate, {len(self.actors) + len(self.meshes)} unique cells)")
+
+
+class FileStats:
+    """Row counts for one CSV file (or one chunk of it)"""
+
+    COUNTERS = ("rows", "included", "staticmeshes", "blueprints", "skipped", "skipped_blueprints",
+                "origin_skipped", "errors", "bytes_read")
+
+    def __init__(self):
+        self.rows = 0
+        self.included = 0
+        self.staticmeshes = 0
+        self.blueprints = 0
+        self.skipped = 0
+        self.skipped_blueprints = 0
+        self.origin_skipped = 0
+        self.errors = 0
+        self.bytes_read = 0
+        # Known problematic assets found, in first-seen order
+        self.problematic_assets = []
+        # rule name -> rows it skipped
+        self.rule_hits = Counter()
+        # (rule name, asset path) -> rows skipped
+        self.skipped_assets = Counter()
+
+    def merge(self, other):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for path in other.problematic_assets:
+            if path not in self.problematic_assets:
+                self.problematic_assets.append(path)
+        self.rule_hits.update(other.rule_hits)
+        self.skipped_assets.update(other.skipped_assets)
+
+
+class OutputProfile:
+    """One INI to write from a conversion, with its own output options"""
+
+    # name -> (add_once_to_blueprints, filter_all_blueprints)
+    PRESETS = {
+        "once": (True, False),
+        "no-once": (False, False),
+        "staticmesh-only": (False, True),
+    }
+
+    def __init__(self, output_file, add_once_to_blueprints=True, filter_all_blueprints=False, name=None,
+                 shard_dir=None):
+        # Combined INI; may be None when only shards are written
+        self.output_file = output_file
+        self.add_once_to_blueprints = add_once_to_blueprints
+        self.filter_all_blueprints = filter_all_blueprints
+        # Directory for one INI per scenario, or None
+        self.shard_dir = shard_dir
+        if not output_file and not shard_dir:
+            raise ValueError("An output profile needs an output file or a shard directory")
+        if output_file and shard_dir and os.path.normcase(os.path.abspath(shard_dir)) == \
+                os.path.normcase(os.path.dirname(os.path.abspath(output_file))):
+            # A shard could overwrite the output, and stale shards are removed from there
+            raise ValueError(f"The shard directory {shard_dir} must not be the folder of the output {output_file}")
+        self.name = name or os.path.basename(output_file or os.path.normpath(shard_dir))
+
+    @property
+    def output_dir(self):
+        """Directory the profile writes to, used for temporary files"""
+        return os.path.dirname(os.path.abspath(self.output_file)) if self.output_file else self.shard_dir
+
+    @property
+    def once(self):
+        return self.add_once_to_blueprints and not self.filter_all_blueprints
+
+    @classmethod
+    def preset(cls, name, output_file, shard_dir=None):
+        try:
+            add_once, filter_all = cls.PRESETS[name]
+        except KeyError:
+            raise ValueError(f"Unknown profile {name!r} (expected one of {', '.join(cls.PRESETS)})")
+        return cls(output_file, add_once, filter_all, name, shard_dir)
+
+
+def variant_profiles(output_file, shard_dir=None):
+    """The three usual variants next to output_file: _Once, _NoOnce and _StaticMeshOnly
+
+    With shard_dir each variant's shards go into a subdirectory of that name.
+    """
+    base, ext = os.path.splitext(output_file)
+    profiles = []
+    for name, suffix in (("once", "_Once"), ("no-once", "_NoOnce"), ("staticmesh-only", "_StaticMeshOnly")):
+        variant_shards = os.path.join(shard_dir, suffix.lstrip('_')) if shard_dir else None
+        profiles.append(OutputProfile.preset(name, f"{base}{suffix}{ext or '.ini'}", variant_shards))
+    return profiles
+
+
+class ProfileRun:
+    """The entries of one OutputProfile while a conversion runs"""
+
+    def __init__(self, profile, combined, shards=None):
+        self.profile = profile
+        # Entries of the combined INI: a PlacementStore, a
+        # SpooledConfigWriter or None
+        self.combined = combined
+        # ScenarioShards when writing per-scenario INIs
+        self.shards = shards
+        # Every kept entry ends up here; len() is the number of entries
+        self.entries = shards if shards is not None else combined
+        # Where new entries are appended: entries, or a deduper/culler in front of it
+        self.sink = self.entries
+        self.deduper = None
+        self.culler = None
+
+    def close(self):
+        if isinstance(self.combined, SpooledConfigWriter):
+            self.combined.close()
+        if self.shards is not None:
+            self.shards.close()
+
+
+class ProfileFanout:
+    """Sink that hands every entry to each profile that keeps it"""
+
+    def __init__(self, runs):
+        self.sinks = [(run.profile.filter_all_blueprints, run.sink) for run in runs]
+
+    def append(self, entry):
+        blueprint = entry['Type'] == 'Blueprint'
+        for filter_all_blueprints, sink in self.sinks:
+            if not (blueprint and filter_all_blueprints):
+                sink.append(entry)
+
+
+class ConverterEngine:
+    """Converts Unreal actor dump CSVs into a CustomObjects INI"""
+
+    def __init__(self, options=None, log=None, progress=None, detail=None, status=None, cancel=None):
+        self.options = options if options is not None else ConversionOptions()
+        # log(message) receives every line of the conversion log
+        self.log = log if log is not None else _print_log
+        # detail(kind, message) receives the per-row messages; they go to
+        # log unless the caller routes them elsewhere (or drops them)
+        self.detail = detail if detail is not None else (lambda kind, message: self.log(message))
+        # kind -> per-row messages emitted for the current file
+        self.row_messages = Counter()
+        # progress(percent) and status(text) are called as the CSVs are
+        # read, throttled; text has the bytes read, rows/s and the ETA
+        self.progress = progress
+        self.status = status
+        # Anything with is_set(), e.g. a threading.Event: once set the run
+        # stops at the next batch of rows and raises ConversionCancelled
+        self.cancel = cancel
+        # ProgressTracker while CSVs are being parsed
+        self.tracker = None
+        # Compiled once and shared by every file of every run
+        self.rules = load_rule_set(self.options.rules_file)
+        # rule name -> rows skipped by it in the current run
+        self.rule_hits = Counter()
+        # (rule name, asset path) -> rows skipped in the current run
+        self.skipped_assets = Counter()
+        self.budgets = BudgetSet.load(self.options.budgets_file) if self.options.budgets_file else None
+        # AssetManifest checked after the filter rules, loaded from its cached index
+        self.manifest = None
+        if self.options.manifest_file:
+            # Imported here because the manifest module builds on this one
+            from .manifest import load_manifest
+            self.manifest = load_manifest(self.options.manifest_file, self.options.cache_dir)
+        # Stage timings and (csv_path, scenario, FileStats) of the current run
+        self.timings = StageTimings()
+        self.file_reports = []
+        # PlacementDeduper and PlacementCuller of the current run when enabled
+        self.deduper = None
+        self.culler = None
+
+    def convert(self, csv_files, output_file):
+        """Convert a list of (csv_path, scenario_name) tuples into output_file
+
+        With options.shard_dir one INI per scenario is written there too;
+        output_file may then be None to skip the combined INI. Returns the
+        number of configuration entries written.
+        """
+        profile = OutputProfile(output_file, self.options.add_once_to_blueprints,
+                                self.options.filter_all_blueprints, shard_dir=self.options.shard_dir)
+        return self.convert_profiles(csv_files, [profile])[0]
+
+    def update(self, csv_files, output_file):
+        """Update an existing output_file, parsing only the scenarios whose CSVs changed
+
+        Asset indices already in output_file are kept and new assets are
+        appended; see customobjects.incremental. Returns the number of
+        scenarios parsed again.
+        """
+        # Imported here because the incremental module builds on this one
+        from .incremental import update_output
+        self.timings = StageTimings()
+        return update_output(self, csv_files, output_file)
+
+    def preview(self, csv_files, sample_bytes=None):
+        """Estimate the result of converting csv_files from a sample of their rows
+
+        Returns a ConversionPreview; see customobjects.preview. Nothing is
+        written.
+        """
+        # Imported here because the preview module builds on this one
+        from .preview import DEFAULT_SAMPLE_BYTES, preview_conversion
+        return preview_conversion(self, csv_files, sample_bytes or DEFAULT_SAMPLE_BYTES)
+
+    def convert_profiles(self, csv_files, profiles):
+        """Parse the CSVs once and write one INI per OutputProfile
+
+        Each profile gets its own entries and, if enabled, its own deduper
+        and culler, so every INI is identical to a separate conversion with
+        that profile's options. Returns the entries written per profile.
+        """
+        if not self.options.profile_file:
+            return self._convert(csv_files, profiles)
+
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(self._convert, csv_files, profiles)
+        finally:
+            profiler.dump_stats(self.options.profile_file)
+            self.log(f"Profile written to {self.options.profile_file}")
+
+    def _convert(self, csv_files, profiles):
+        started = time.time()
+        self.log("Starting conversion...")
+        self.rule_hits.clear()
+        self.skipped_assets.clear()
+        self.timings = StageTimings()
+        self.file_reports = []
+
+        # Blueprints are only filtered while parsing when no profile wants
+        # them; otherwise the StaticMesh only profiles drop them afterwards
+        run_options = self.options
+        self.options = copy.copy(run_options)
+        self.options.filter_all_blueprints = all(p.filter_all_blueprints for p in profiles)
+
+        # Separate dictionaries for blueprints and static meshes
+        blueprint_assets = {}  # path -> index
+        staticmesh_assets = {}  # path -> index
+        cache = DecisionCache()
+        total_included = 0
+        usage_index = None
+        if self.options.index_db:
+            # Imported here because the usage index module builds on this one
+            from .usage_index import UsageIndexWriter
+            usage_index = UsageIndexWriter(self.options.index_db)
+        runs = [self._open_profile(profile, usage_index if i == 0 else None) for i, profile in enumerate(profiles)]
+        sink = runs[0].sink if len(runs) == 1 else ProfileFanout(runs)
+        if usage_index is not None:
+            sink = usage_index.wrap_run(sink, self.file_reports)
+        self.deduper = runs[0].deduper
+        self.culler = runs[0].culler
+
+        try:
+            total_included = self._parse_csvs(csv_files, blueprint_assets, staticmesh_assets, sink, cache)
+            self._check_cancelled()
+
+            if len(runs) == 1:
+                if self.deduper is not None:
+                    total_included -= self.log_collapsed()
+                if self.culler is not None:
+                    total_included -= self.log_culled()
+
+            self.log(f"\nTotal unique assets: {len(blueprint_assets) + len(staticmesh_assets)}")
+            self.log(f"  Blueprint assets: {len(blueprint_assets)}")
+            self.log(f"  Static mesh assets: {len(staticmesh_assets)}")
+            self.log(f"Total configuration entries: {total_included}")
+            self.log_rule_hits()
+            self.log_unknown_assets()
+            self.log(cache.summary())
+
+            for run in runs:
+                if len(runs) > 1:
+                    self.log(f"\nProfile {run.profile.name}: {len(run.entries)} configuration entries")
+                    self.deduper = run.deduper
+                    self.culler = run.culler
+                    if self.deduper is not None:
+                        self.log_collapsed()
+                    if self.culler is not None:
+                        self.log_culled()
+                self._write_profile(run, blueprint_assets, staticmesh_assets)
+            self.deduper = runs[0].deduper
+            self.culler = runs[0].culler
+            if usage_index is not None:
+                if runs[0].profile.filter_all_blueprints:
+                    blueprint_assets = {}
+                usage_index.finish(blueprint_assets, staticmesh_assets, self.file_reports)
+                usage_index = None
+        finally:
+            self.options = run_options
+            for run in runs:
+                run.close()
+            if usage_index is not None:
+                usage_index.discard()
+
+        for run in runs:
+            if run.profile.output_file:
+                self.log(f"\nOutput written to {run.profile.output_file}")
+            if run.shards is not None:
+                self.log(f"\nScenario shards written to {run.profile.shard_dir}")
+        if self.options.index_db:
+            self.log(f"Usage index written to {self.options.index_db}")
+        if self.options.run_report:
+            output_file = runs[0].profile.output_file or os.path.join(runs[0].profile.shard_dir, "CustomObjects.ini")
+            path = report_path(output_file)
+            write_run_report(path, build_run_report(self, output_file, started, time.time() - started, runs))
+            self.log(f"Run report written to {path}")
+        self.log("Conversion completed successfully!")
+        self._report_progress(100)
+        return [len(run.entries) for run in runs]
+
+    def _parse_csvs(self, csv_files, blueprint_assets, staticmesh_assets, sink, cache):
+        """Parse every CSV into the asset tables and sink; returns the entries included"""
+        total_bytes = sum(os.path.getsize(csv_file) for csv_file, _ in csv_files)
+        self.tracker = ProgressTracker(total_bytes, self.progress, self.status)
+        try:
+            if self.options.workers > 1 or self.options.cache_dir:
+                return self._process_units(csv_files, blueprint_assets, staticmesh_assets, sink, cache)
+
+            total_included = 0
+            # Process each CSV file
+            for csv_file, scenario in csv_files:
+                self.tracker.start_file()
+                self.log(f"\nProcessing {os.path.basename(csv_file)} for scenario {scenario}...")
+
+                included = self.process_csv(csv_file, scenario, blueprint_assets, staticmesh_assets, sink, cache)
+                total_included += included
+            return total_included
+        finally:
+            self.tracker.report(force=True)
+            self.tracker = None
+
+    def _open_profile(self, profile, usage_index=None):
+        """Create the entry list or spool of a profile and its sink chain
+
+        With a UsageIndexWriter the entries kept are also recorded in it.
+        """
+        combined = None
+        if profile.output_file:
+            if self.options.streaming:
+                combined = SpooledConfigWriter(profile.output_dir, once=profile.once)
+            else:
+                combined = PlacementStore()
+        shards = None
+        if profile.shard_dir:
+            # Imported here because the shards module builds on this one
+            from .shards import ScenarioShards
+            os.makedirs(profile.shard_dir, exist_ok=True)
+            shards = ScenarioShards(profile.shard_dir, combined, profile.once, self.options.streaming)
+        run = ProfileRun(profile, combined, shards)
+        if usage_index is not None:
+            run.sink = usage_index.wrap_entries(run.sink)
+        return self._add_sink_filters(run)
+
+    def _add_sink_filters(self, run):
+        """Put the culler and deduper, if enabled, in front of run.entries"""
+        # Entries go through the deduper and then the culler on their way to
+        # the entries so duplicates don't use up budgets
+        if self.budgets is not None:
+            run.sink = run.culler = PlacementCuller(run.sink, self.budgets)
+        if self.options.dedupe:
+            run.sink = run.deduper = PlacementDeduper(run.sink, self.options.dedupe_tolerance)
+        return run
+
+    def _write_profile(self, run, blueprint_assets, staticmesh_assets):
+        if run.profile.filter_all_blueprints:
+            # StaticMesh only: no blueprint asset table
+            blueprint_assets = {}
+        write = self.timings.write
+        write_start = time.perf_counter()
+        if run.profile.output_file:
+            self.write_ini(run.profile.output_file, blueprint_assets, staticmesh_assets, run.combined,
+                           run.profile.once)
+            write.rows += len(blueprint_assets) + len(staticmesh_assets) + len(run.combined)
+            write.bytes_written += os.path.getsize(run.profile.output_file)
+        if run.shards is not None:
+            changed, unchanged, removed = run.shards.write(blueprint_assets, staticmesh_assets)
+            write.rows += len(run.shards)
+            write.bytes_written += sum(os.path.getsize(path) for path in changed)
+            self.log(f"Scenario shards: {len(changed)} written, {len(unchanged)} unchanged")
+            if removed:
+                self.log(f"Removed shards of scenarios no longer converted: "
+                         f"{', '.join(os.path.basename(path) for path in removed)}")
+        write.seconds += time.perf_counter() - write_start
+
+    def _process_units(self, csv_files, blueprint_assets, staticmesh_assets, config_entries, cache):
+        """Parse the CSVs as work units and merge the results in input order
+
+        Units are parsed in a process pool when there are several workers,
+        and loaded from the result cache instead when it has them.
+        """
+        # Imported here because the parallel module builds on this one
+        from .parallel import ChunkEngine, parse_units, plan_units
+
+        parallel = self.options.workers > 1
+        # Without workers each CSV is one unit, so cache entries are per file
+        units = plan_units(csv_files, self.options.chunk_size if parallel else 0)
+
+        keys = [None] * len(units)
+        cached = [False] * len(units)
+        result_cache = None
+        if self.options.cache_dir:
+            result_cache = ResultCache(self.options.cache_dir, self.options, self.rules, self.options.cache_size,
+                                       self.manifest.digest if self.manifest is not None else None)
+            for i, unit in enumerate(units):
+                keys[i] = result_cache.key(unit)
+                cached[i] = result_cache.touch(keys[i])
+
+        parser = None
+
+        def parse_here(unit):
+            """Parse unit in this process, reporting progress and checking for cancel per batch of rows"""
+            nonlocal parser
+            if parser is None:
+                # One engine for every unit, so rules and manifest are loaded once
+                parser = ChunkEngine(self.options)
+            return parser.parse(unit, self.tracker, self.cancel)
+
+        missing = [unit for unit, hit in zip(units, cached) if not hit]
+        if not missing:
+            parsed = iter(())
+        elif parallel:
+            self.log(f"Parsing {len(missing)} work unit(s) with {self.options.workers} worker processes")
+            parsed = parse_units(self.options, missing, self.options.workers, self.cancel)
+        else:
+            # Parsed one unit at a time as they are merged
+            parsed = map(parse_here, missing)
+
+        file_sizes = {}
+        unit_sizes = []
+        for unit in units:
+            if unit.csv_file not in file_sizes:
+                file_sizes[unit.csv_file] = os.path.getsize(unit.csv_file)
+            end = unit.end if unit.end is not None else file_sizes[unit.csv_file]
+            unit_sizes.append(max(0, end - unit.start))
+
+        merge = self.timings.merge
+        total_included = 0
+        stats = None
+        row_base = 0
+        for i, unit in enumerate(units):
+            # Cached results are loaded one at a time as they are merged
+            load_start = time.perf_counter()
+            result = result_cache.load(keys[i]) if cached[i] else None
+            merge.seconds += time.perf_counter() - load_start
+            # Rows already reported to the tracker while the unit was parsed
+            reported_rows = 0
+            if result is None:
+                if cached[i]:
+                    # Removed or unreadable since it was checked
+                    result = parse_here(unit)
+                    reported_rows = result.stats.rows
+                else:
+                    result = next(parsed)
+                    if not parallel:
+                        reported_rows = result.stats.rows
+                # Only freshly parsed units add to this run's parse stages
+                self.timings.update(result.timings)
+                if result_cache is not None:
+                    result_cache.put(keys[i], result)
+            if stats is None or unit.file_index != units[i - 1].file_index:
+                if stats is not None:
+                    self.log_file_summary(stats)
+                    total_included += stats.included
+                self.log(f"\nProcessing {os.path.basename(unit.csv_file)} for scenario {unit.scenario}...")
+                self.row_messages.clear()
+                stats = FileStats()
+                self.file_reports.append((unit.csv_file, unit.scenario, stats))
+                row_base = 0
+
+            merge_start = time.perf_counter()
+            self.merge_result(result, unit.scenario, blueprint_assets, staticmesh_assets, config_entries, cache,
+                              stats, row_base)
+            merge.seconds += time.perf_counter() - merge_start
+            merge.rows += len(result.records)
+            row_base += result.stats.rows
+            if self.tracker is not None:
+                self.tracker.advance(unit_sizes[i], result.stats.rows - reported_rows)
+            if self.cancel is not None and self.cancel.is_set():
+                if parallel and missing:
+                    # Stops the workers and cancels the units they have not started
+                    parsed.close()
+                self._check_cancelled()
+
+        if stats is not None:
+            self.log_file_summary(stats)
+            total_included += stats.included
+        if result_cache is not None:
+            self.log(f"\n{result_cache.summary()}")
+        return total_included
+
+    def merge_result(self, result, scenario, blueprint_assets, staticmesh_assets, config_entries, cache, stats,
+                     row_base=0):
+        """Add a worker's ParseResult to the run, remapping its asset indices
+
+        Results must be merged in input order so that new assets get the
+        same first-seen indices as in a sequential run.
+        """
+        blueprint_map = [_asset_index(blueprint_assets, path) for path in result.blueprint_paths]
+        staticmesh_map = [_asset_index(staticmesh_assets, path) for path in result.staticmesh_paths]
+        once = self.options.add_once_to_blueprints
+
+        for is_blueprint, index, location, rotation in result.records:
+            if is_blueprint:
+                config_entry = {
+                    'Scenario': scenario,
+                    'Type': 'Blueprint',
+                    'AssetIndex': blueprint_map[index],
+                    'Location': location,
+                    'Rotation': rotation
+                }
+                if once:
+                    config_entry['Once'] = True
+            else:
+                config_entry = {
+                    'Scenario': scenario,
+                    'Type': 'StaticMesh',
+                    'AssetIndex': staticmesh_map[index],
+                    'Location': location,
+                    'Rotation': rotation
+                }
+            config_entries.append(config_entry)
+
+        for event in result.events:
+            if event[0] == "log":
+                self.log(event[1])
+            elif event[0] == "detail":
+                self._row_message(event[1], event[2])
+            elif event[0] == "problem":
+                if event[1] not in stats.problematic_assets:
+                    stats.problematic_assets.append(event[1])
+                    self._log_problem_asset(event[1])
+            else:
+                _, row_num, error, mesh_cell = event
+                self._row_error(row_base + row_num, error, mesh_cell)
+
+        stats.merge(result.stats)
+        self.rule_hits.update(result.rule_hits)
+        self.skipped_assets.update(result.stats.skipped_assets)
+        cache.hits += result.cache_hits
+        cache.misses += result.cache_misses
+        cache.merged = True
+
+    def write_ini(self, output_file, blueprint_assets, staticmesh_assets, config_entries, once=None):
+        """Write the asset tables and config entries to output_file
+
+        config_entries is a PlacementStore, a SpooledConfigWriter or a list
+        of entry dicts.
+        once overrides the entries' own Once flags, see format_config_entry.
+        """
+        with atomic_open(output_file, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(INI_SECTION + "\n")
+
+            # First, write all blueprint assets
+            if blueprint_assets:
+                for path, index in sorted(blueprint_assets.items(), key=lambda x: x[1]):
+                    f.write(f";Index {index}\nAssets=BlueprintGeneratedClass'{path}_C'\n")
+
+            # Then, write all static mesh assets
+            if staticmesh_assets:
+                for path, index in sorted(staticmesh_assets.items(), key=lambda x: x[1]):
+                    f.write(f";Index {index}\nStaticMeshAssets=StaticMesh'{path}'\n")
+
+            # Write config entries
+            if isinstance(config_entries, SpooledConfigWriter):
+                config_entries.copy_to(f)
+            elif isinstance(config_entries, PlacementStore):
+                config_entries.write_to(f, once)
+            else:
+                f.writelines(format_config_entry(entry, once) for entry in config_entries)
+
+    def process_csv(self, csv_file, scenario, blueprint_assets, staticmesh_assets, config_entries, cache=None):
+        """Process a single CSV file and update assets and config_entries
+
+        cache is the run's DecisionCache; it must only be shared between
+        calls that use the same asset dictionaries.
+        """
+        if cache is None:
+            cache = DecisionCache()
+        self.row_messages.clear()
+        stats = FileStats()
+        stats.bytes_read = os.path.getsize(csv_file)
+        self.timings.read.bytes_read += stats.bytes_read
+        self.file_reports.append((csv_file, scenario, stats))
+
+        with open_csv_source(csv_file) as (reader, tell):
+            self._process_rows(reader, scenario, blueprint_assets, staticmesh_assets, config_entries, cache, stats,
+                               tell=tell)
+
+        self.log_file_summary(stats)
+        return stats.included
+
+    def _process_rows(self, reader, scenario, blueprint_assets, staticmesh_assets, config_entries, cache, stats,
+                      first_row_num=1, tell=None):
+        """Filter and index the data rows of reader, adding the counts to stats
+
+        tell() is the byte offset reached in the file, for progress reporting.
+        """
+        options = self.options
+        actor_decisions = cache.actors
+        mesh_decisions = cache.meshes
+        skipped_count = 0
+        skipped_bp_count = 0
+        included_count = 0
+        problematic_assets_found = stats.problematic_assets
+        origin_skipped = 0
+        error_count = 0
+        rule_hits_before = self.rule_hits.copy()
+        skipped_assets_before = self.skipped_assets.copy()
+
+        # Track different asset types
+        staticmesh_count = 0
+        blueprint_count = 0
+
+        rotations = cache.rotations
+        max_rotations = cache.MAX_ROTATIONS
+        parse_locations = row_parser.parse_locations
+
+        # Stages are timed per batch; per unique cell work is timed where it happens
+        timings = self.timings
+        clock = time.perf_counter
+        read_seconds = parse_seconds = loop_seconds = 0.0
+        inner_before = timings.parse.seconds + timings.filter.seconds + timings.index.seconds
+        tracker = self.tracker if tell is not None else None
+        cancel = self.cancel
+
+        row_num = first_row_num - 1
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ConversionCancelled("Conversion cancelled")
+            start = clock()
+            batch = list(islice(reader, ROW_BATCH_SIZE))
+            read_done = clock()
+            read_seconds += read_done - start
+            if not batch:
+                break
+            if tracker is not None:
+                tracker.update(tell(), len(batch))
+            # Convert the whole batch of locations at once
+            locations = parse_locations([row[2] if len(row) >= 6 else "" for row in batch])
+            parse_done = clock()
+            parse_seconds += parse_done - read_done
+
+            for row, location in zip(batch, locations):
+                row_num += 1
+                try:
+                    if len(row) < 6:
+                        continue
+
+                    # Location is parsed first to check if we should skip it
+                    if location is None:
+                        origin_skipped += 1
+                        continue
+                    if location.__class__ is not tuple:
+                        raise location
+
+                    # Check for blueprint assets first, once per unique actor cell
+                    decision = actor_decisions.get(row[1], _MISSING)
+                    if decision is _MISSING:
+                        cache.misses += 1
+                        decision = actor_decisions[row[1]] = self._decide_actor_cell(row[1], blueprint_assets)
+                    else:
+                        cache.hits += 1
+
+                    if decision is not None:
+                        bp_path = decision.path
+
+                        # Skip all blueprints if the option is enabled
+                        if decision.filtered:
+                            skipped_bp_count += 1
+                            continue
+
+                        # Skipped by the asset rules or the blueprint actor rules
+                        rule = decision.rule
+                        if rule is not None:
+                            self._record_rule_hit(rule, bp_path)
+                            if rule.scope == SCOPE_BLUEPRINT_ACTOR:
+                                self._row_message("skip_blueprint", f"  Skipping possibly problematic blueprint: {bp_path}")
+                            skipped_count += 1
+                            continue
+
+                        # If we got here, it's a blueprint we want to keep
+                        self._row_message("include_blueprint", f"  Including blueprint: {bp_path}")
+
+                        # Rotation cells repeat a lot, parse each one once
+                        rotation = rotations.get(row[3])
+                        if rotation is None:
+                            rotation = self._parse_rotation_cell(row[3], rotations, max_rotations)
+
+                        # Create the config entry
+                        config_entry = {
+                            'Scenario': scenario,
+                            'Type': 'Blueprint',
+                            'AssetIndex': decision.index,
+                            'Location': location,
+                            'Rotation': rotation
+                        }
+
+                        # Add "Once" parameter if enabled
+                        if options.add_once_to_blueprints:
+                            config_entry['Once'] = True
+
+                        config_entries.append(config_entry)
+                        included_count += 1
+                        blueprint_count += 1
+                    else:
+                        # Try for static mesh, once per unique meshes cell
+                        decision = mesh_decisions.get(row[5])
+                        if decision is None:
+                            cache.misses += 1
+                            decision = mesh_decisions[row[5]] = self._decide_mesh_cell(row[5], staticmesh_assets)
+                        else:
+                            cache.hits += 1
+
+                        # Skip problematic assets
+                        if decision.index is None:
+                            skipped_count += 1
+                            mesh_path = decision.path
+                            rule = decision.rule
+
+                            # Record problematic assets for debugging
+                            if rule is not None:
+                                self._record_rule_hit(rule, mesh_path)
+                                if rule.report and mesh_path not in problematic_assets_found:
+                                    problematic_assets_found.append(mesh_path)
+                                    self._log_problem_asset(mesh_path)
+
+                            continue
+
+                        rotation = rotations.get(row[3])
+                        if rotation is None:
+                            rotation = self._parse_rotation_cell(row[3], rotations, max_rotations)
+                        config_entries.append({
+                            'Scenario': scenario,
+                            'Type': 'StaticMesh',
+                            'AssetIndex': decision.index,
+                            'Location': location,
+                            'Rotation': rotation
+                        })
+                        included_count += 1
+                        staticmesh_count += 1
+                except Exception as e:
+                    error_count += 1
+                    self._row_error(row_num, str(e), row[5] if len(row) >= 6 else None)
+            loop_seconds += clock() - parse_done
+
+        rows = row_num - first_row_num + 1
+        inner_seconds = timings.parse.seconds + timings.filter.seconds + timings.index.seconds - inner_before
+        timings.read.seconds += read_seconds
+        timings.read.rows += rows
+        timings.parse.seconds += parse_seconds
+        timings.parse.rows += rows
+        timings.assemble.seconds += loop_seconds - inner_seconds
+        timings.assemble.rows += included_count
+
+        stats.rows += rows
+        stats.skipped += skipped_count
+        stats.skipped_blueprints += skipped_bp_count
+        stats.origin_skipped += origin_skipped
+        stats.included += included_count
+        stats.staticmeshes += staticmesh_count
+        stats.blueprints += blueprint_count
+        stats.errors += error_count
+        stats.rule_hits.update(self.rule_hits - rule_hits_before)
+        stats.skipped_assets.update(self.skipped_assets - skipped_assets_before)
+        return stats
+
+    def _parse_rotation_cell(self, rotation_str, rotations, max_rotations):
+        start = time.perf_counter()
+        rotation = row_parser.parse_rotation_values(rotation_str)
+        self.timings.parse.seconds += time.perf_counter() - start
+        if len(rotations) >= max_rotations:
+            rotations.clear()
+        rotations[rotation_str] = rotation
+        return rotation
+
+    def log_file_summary(self, stats):
+        """Log the per-file counts after a CSV has been processed"""
+        self.log(f"  Skipped problematic assets: {stats.skipped}")
+        if self.options.filter_all_blueprints:
+            self.log(f"  Skipped all blueprints: {stats.skipped_blueprints}")
+        self.log(f"  Skipped objects at origin (0,0,0): {stats.origin_skipped}")
+        self.log(f"  Included assets: {stats.included} (StaticMesh: {stats.staticmeshes}, Blueprint: {stats.blueprints})")
+
+        if not stats.problematic_assets:
+            self.log("  No known problematic assets were found in this file.")
+
+        if self.options.collapse_row_messages and self.row_messages:
+            self.log("  Per-row messages:")
+            for kind, count in self.row_messages.items():
+                self.log(f"    {ROW_MESSAGE_LABELS[kind]}: {count}")
+
+    def _log_problem_asset(self, mesh_path):
+        self.log(f"  Found and skipped problematic asset: {mesh_path}")
+
+    def _row_error(self, row_num, error, mesh_cell):
+        message = f"  Error processing row {row_num}: {error}"
+        if mesh_cell is not None:
+            message += f"\n  Row content (mesh part): {mesh_cell}"
+        self._row_message("row_error", message)
+
+    def parse_mesh_path(self, meshes_str):
+        """Parse static mesh path from meshes string"""
+        return row_parser.parse_mesh_path(meshes_str)
+
+    def parse_blueprint_path(self, actor_str):
+        """Parse blueprint path from actor string"""
+        return row_parser.parse_blueprint_path(actor_str)
+
+    def parse_location(self, location_str):
+        return row_parser.parse_location(location_str)
+
+    def parse_rotation(self, rotation_str):
+        """
+        Parse rotation string and always use Roll;Pitch;Yaw order
+        since that's the correct mapping
+        """
+        return row_parser.parse_rotation(rotation_str)
+
+    def should_skip_asset(self, mesh_path):
+        # Skip if path is None
+        if mesh_path is None:
+            return True
+        return self.match_asset(mesh_path) is not None
+
+    def match_asset(self, path, blueprint_actor=False):
+        """Return the filter rule that skips path, or None to keep it"""
+        rule = self.rules.match(path, blueprint_actor)
+        if rule is None and self.manifest is not None:
+            rule = self.manifest.match(path)
+        if rule is not None:
+            self._record_rule_hit(rule, path)
+        return rule
+
+    def _record_rule_hit(self, rule, path):
+        self.rule_hits[rule.name] += 1
+        self.skipped_assets[rule.name, path] += 1
+        if rule.report:
+            self._row_message("skip_problem", f"Skipping problematic asset: {path}")
+
+    def _decide_actor_cell(self, actor_str, blueprint_assets):
+        """Decision for a raw actor cell, or None when it is not a blueprint"""
+        start = time.perf_counter()
+        bp_path = row_parser.parse_blueprint_path(actor_str)
+        self.timings.parse.seconds += time.perf_counter() - start
+        return self._decide_blueprint(bp_path, blueprint_assets) if bp_path else None
+
+    def _decide_mesh_cell(self, meshes_str, staticmesh_assets):
+        """Decision for a raw meshes cell"""
+        start = time.perf_counter()
+        mesh_path = row_parser.parse_mesh_path(meshes_str)
+        self.timings.parse.seconds += time.perf_counter() - start
+        return self._decide_asset(mesh_path, staticmesh_assets)
+
+    def _decide_blueprint(self, bp_path, blueprint_assets):
+        if self.options.filter_all_blueprints:
+            return AssetDecision(sys.intern(bp_path), filtered=True)
+        return self._decide_asset(bp_path, blueprint_assets, blueprint_actor=True)
+
+    def _decide_asset(self, path, assets, blueprint_actor=False):
+        """Run the filters on a parsed path and assign its index if kept"""
+        if path is None:
+            return AssetDecision(None)
+        path = sys.intern(path)
+        timings = self.timings
+        start = time.perf_counter()
+        rule = self.rules.match(path, blueprint_actor)
+        if rule is None and self.manifest is not None:
+            rule = self.manifest.match(path)
+        matched = time.perf_counter()
+        timings.filter.seconds += matched - start
+        timings.filter.rows += 1
+        if rule is not None:
+            return AssetDecision(path, rule=rule)
+
+        index = _asset_index(assets, path)
+        timings.index.seconds += time.perf_counter() - matched
+        timings.index.rows += 1
+        return AssetDecision(path, index=index)
+
+    def _row_message(self, kind, message):
+        self.row_messages[kind] += 1
+        self.detail(kind, message)
+
+    def log_collapsed(self):
+        """Log the duplicate placements dropped per scenario and return the total"""
+        self.log("\nCollapsed duplicate placements:")
+        for scenario, count in self.deduper.collapsed.items():
+            self.log(f"  {scenario}: {count}")
+        total = self.deduper.total_collapsed
+        if not total:
+            self.log("  None found")
+        return total
+
+    def log_culled(self):
+        """Log the placements dropped by the budgets per scenario and return the total"""
+        self.log("\nCulled placements:")
+        for scenario, reasons in self.culler.culled_by_scenario().items():
+            self.log(f"  {scenario}: {sum(reasons.values())}")
+            for reason, count in reasons.items():
+                self.log(f"    {CULL_LABELS[reason]}: {count}")
+        total = self.culler.total_culled
+        if not total:
+            self.log("  None")
+        unplaced = self.culler.unplaced_assets
+        if unplaced:
+            # Dropping them would renumber the asset indices every entry refers to
+            self.log(f"  {unplaced} asset(s) have no placements left but stay in the asset tables")
+        return total
+
+    def log_rule_hits(self):
+        """Log how many rows each filter rule skipped in this run"""
+        if not self.rule_hits:
+            return
+        self.log("Filter rule hits:")
+        for name, count in sorted(self.rule_hits.items(), key=lambda x: (-x[1], x[0])):
+            self.log(f"  {name}: {count}")
+
+    def log_unknown_assets(self):
+        """Log the assets skipped because they are not in the manifest; returns how many"""
+        if self.manifest is None:
+            return 0
+        name = self.manifest.rule.name
+        unknown = sorted((path, rows) for (rule, path), rows in self.skipped_assets.items() if rule == name)
+        if not unknown:
+            self.log("Every asset is in the manifest")
+            return 0
+        self.log(f"Assets not in the manifest: {len(unknown)} ({sum(rows for _, rows in unknown)} rows skipped)")
+        for path, rows in unknown:
+            self.log(f"  {path}: {rows} rows")
+        return len(unknown)
+
+    def _check_cancelled(self):
+        if self.cancel is not None and self.cancel.is_set():
+            raise ConversionCancelled("Conversion cancelled")
+
+    def _report_progress(self, percent):
+        if self.progress is not None:
+            self.progress(percent)
+
+
+def _asset_index(assets, path):
+    """Index of path in assets, adding it at the end if not already there"""
+    index = assets.get(path)
+    if index is None:
+        index = assets[path] = len(assets)
+    return index
+
+
+def format_config_entry(entry, once=None):
+    """Format a config entry dict as a Configs= line
+
+    Location is an (x, y, z) and Rotation a (roll, pitch, yaw) tuple of
+    ints. once=None uses the entry's own Once flag; True or False adds Once
+    to every blueprint entry or to none.
+    """
+    x, y, z = entry['Location']
+    roll, pitch, yaw = entry['Rotation']
+    params = [
+        f"Scenario={entry['Scenario']}",
+        f"Type={entry['Type']}",
+        f"AssetIndex={entry['AssetIndex']}",
+        f"Location={x};{y};{z}",
+        f"Rotation={roll};{pitch};{yaw}"
+    ]
+
+    # Add Once parameter if specified
+    if once is None:
+        once = entry.get('Once', False)
+    elif once:
+        once = entry['Type'] == 'Blueprint'
+    if once:
+        params.append("Once")
+
+    return f"Configs=({', '.join(params)})\n"
+
+
+class SpooledConfigWriter:
+    """Collects Configs= lines in a temporary file instead of in memory
+
+    The asset tables have to come before the Configs= lines in the INI but
+    are only complete once every CSV is parsed. Spooling the formatted lines
+    keeps memory proportional to the number of unique assets; write_ini
+    then copies the spooled body after the header in large blocks.
+    """
+
+    def __init__(self, directory=None, once=None):
+        # newline='\n' keeps the spool untranslated; the output file does the
+        # platform newline translation exactly as a direct write would
+        self._file = tempfile.TemporaryFile(mode='w+', dir=directory, encoding='utf-8', newline='\n',
+                                            buffering=WRITE_BUFFER_SIZE, prefix="customobjects-", suffix=".spool")
+        self.count = 0
+        # Passed on to format_config_entry
+        self.once = once
+
+    def append(self, entry):
+        self._file.write(format_config_entry(entry, self.once))
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def copy_to(self, f):
+        """Copy every spooled line to the text file f"""
+        self._file.flush()
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, f, WRITE_BUFFER_SIZE)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,192 @@
+"""Declarative asset filter rules compiled into a single matcher.
+
+A rule set is a list of rules, each with a name, one or more substrings
+to look for in the asset path and a scope that says which paths it applies
+to. Rule sets can be loaded from a JSON file; without one the built-in
+DEFAULT_RULES are used. Example file:
+
+    {"rules": [
+        {"name": "doors", "contains": ["Door", "door"]},
+        {"name": "wires", "contains": "BP_Wire", "scope": "blueprint"}
+    ]}
+"""
+import json
+import re
+
+# Checked for every asset path
+SCOPE_ANY = "any"
+# Checked for paths that look like blueprints (not '.SM_' and no 'StaticMesh')
+SCOPE_BLUEPRINT = "blueprint"
+# Only checked for rows whose actor is a Blueprint/DynamicClass
+SCOPE_BLUEPRINT_ACTOR = "blueprint_actor"
+
+SCOPES = (SCOPE_ANY, SCOPE_BLUEPRINT, SCOPE_BLUEPRINT_ACTOR)
+
+DEFAULT_RULES = [
+    # Specific problematic static meshes (always filter these)
+    {"name": "problem:SM_TrafficSigns_Destroyed_01b", "report": True,
+     "contains": "/Game/Environment/Props/Exterior/Signs/SM_TrafficSigns_Destroyed_01b"},
+    {"name": "problem:SM_IndPole_03c", "report": True,
+     "contains": "/Game/Environment/Props/Exterior/Street/SM_IndPole_03c"},
+    {"name": "problem:SM_MetalTower__01", "report": True,
+     "contains": "/Game/Environment/Props/Exterior/Structures/SM_MetalTower__01"},
+    {"name": "problem:plastic_chair_TrailerE3", "report": True,
+     "contains": "/Game/Environment/Props/Dev/plastic_chair_TrailerE3"},
+    # Specific problematic blueprints (always filter these)
+    {"name": "problem:BP_KitSelectionRoom_Sec", "report": True,
+     "contains": "/Game/Environment/BluePrints/KitSelectionRoom/BP_KitSelectionRoom_Sec"},
+    {"name": "problem:BP_KitSelectionRoom_Ins", "report": True,
+     "contains": "/Game/Environment/BluePrints/KitSelectionRoom/BP_KitSelectionRoom_Ins"},
+
+    # Standard keywords (for all assets)
+    {"name": "doors", "contains": ["Door", "door"]},
+    {"name": "merged", "contains": ["MERGED", "Merged"]},
+    {"name": "windows", "contains": ["Window", "window"]},
+    {"name": "traffic_signs", "contains": ["TrafficSign", "trafficsign"]},
+    {"name": "signs", "contains": ["Sign_", "sign_"]},
+
+    # Blueprint keywords known to cause issues, applied even when blueprints are allowed
+    {"name": "bp_lights", "scope": SCOPE_BLUEPRINT, "contains": [
+        "/BluePrints/Lights/", "BP_FluorescentLight", "BP_Lantern_", "BP_LightBulb_",
+        "BP_LightFlourescent_", "BP_LightLamp_", "BP_OilLamp_", "BP_StreetLight_",
+        "BP_StreetWallLamp_",
+    ]},
+    {"name": "bp_fire_barrels", "scope": SCOPE_BLUEPRINT, "contains": "BP_FireBarrel_"},
+    {"name": "bp_kit_selection_rooms", "scope": SCOPE_BLUEPRINT, "contains": "KitSelectionRoom"},
+    {"name": "bp_wires", "scope": SCOPE_BLUEPRINT, "contains": "BP_Wire"},
+    {"name": "bp_splines", "scope": SCOPE_BLUEPRINT, "contains": ["SplineMeshBase", "Sidewalk_Splines"]},
+    {"name": "bp_alarms", "scope": SCOPE_BLUEPRINT, "contains": "Alarm_Loudspeaker"},
+    {"name": "bp_vehicle_spawners", "scope": SCOPE_BLUEPRINT, "contains": "VehicleSpawner"},
+
+    # Blueprint actor categories that are possibly problematic when spawned
+    {"name": "bp_breakables", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Breakables/"},
+    {"name": "bp_shockwave_reactions", "scope": SCOPE_BLUEPRINT_ACTOR,
+     "contains": ["/Game/Game/Actors/ShockwaveReactions/", "BP_SR_"]},
+    {"name": "bp_weapons", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Weapons/"},
+    {"name": "bp_gear", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Gear/"},
+    {"name": "bp_vehicles", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Vehicles/"},
+    {"name": "bp_characters", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Characters/"},
+    {"name": "bp_objectives", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/Objectives/"},
+    {"name": "bp_props", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "BP_Prop_"},
+    {"name": "bp_ai", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/AI/"},
+    {"name": "bp_world_actors", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Game/Actors/World/"},
+    {"name": "bp_environment", "scope": SCOPE_BLUEPRINT_ACTOR, "contains": "/Game/Environment/BluePrints/"},
+]
+
+
+class FilterRule:
+    """A named set of substrings that cause an asset to be skipped"""
+
+    def __init__(self, name, contains, scope=SCOPE_ANY, report=False):
+        if isinstance(contains, str):
+            contains = [contains]
+        if not name or not contains or not all(isinstance(p, str) and p for p in contains):
+            raise ValueError(f"Filter rule {name!r} needs a name and at least one non-empty 'contains' string")
+        if scope not in SCOPES:
+            raise ValueError(f"Filter rule {name!r} has unknown scope {scope!r} (expected one of {', '.join(SCOPES)})")
+        self.name = name
+        self.contains = list(contains)
+        self.scope = scope
+        # Report matches in the log as known problematic assets
+        self.report = bool(report)
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            return cls(data["name"], data["contains"], data.get("scope", SCOPE_ANY), data.get("report", False))
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError(f"Invalid filter rule: {data!r}")
+
+    def to_dict(self):
+        data = {"name": self.name, "contains": self.contains}
+        if self.scope != SCOPE_ANY:
+            data["scope"] = self.scope
+        if self.report:
+            data["report"] = True
+        return data
+
+    def __repr__(self):
+        return f"FilterRule({self.name!r})"
+
+
+class RuleSet:
+    """An ordered rule set compiled into single-regex matchers
+
+    Each compiled pattern is one alternation of every substring that
+    applies, so checking a path costs one regex search no matter how many
+    keywords there are. Blueprint actor rules are checked only after the
+    asset rules found nothing. Within one check the leftmost match wins and
+    ties at the same position go to the rule listed first.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = set()
+        for rule in self.rules:
+            if rule.name in names:
+                raise ValueError(f"Duplicate filter rule name: {rule.name!r}")
+            names.add(rule.name)
+        # looks_like_blueprint -> (regex or None, substring -> rule)
+        self._asset_matchers = {
+            False: self._compile(r for r in self.rules if r.scope == SCOPE_ANY),
+            True: self._compile(r for r in self.rules if r.scope in (SCOPE_ANY, SCOPE_BLUEPRINT)),
+        }
+        self._actor_matcher = self._compile(r for r in self.rules if r.scope == SCOPE_BLUEPRINT_ACTOR)
+
+    @staticmethod
+    def _compile(rules):
+        lookup = {}
+        for rule in rules:
+            for pattern in rule.contains:
+                lookup.setdefault(pattern, rule)
+        if not lookup:
+            return None, lookup
+        return re.compile("|".join(re.escape(pattern) for pattern in lookup)), lookup
+
+    @classmethod
+    def from_data(cls, data):
+        """Build a rule set from a list of rule dicts or {"rules": [...]}"""
+        if isinstance(data, dict):
+            data = data.get("rules")
+        if not isinstance(data, list):
+            raise ValueError("Filter rules must be a list or an object with a 'rules' list")
+        return cls(FilterRule.from_dict(item) for item in data)
+
+    @classmethod
+    def default(cls):
+        return cls.from_data(DEFAULT_RULES)
+
+    @classmethod
+    def load(cls, path):
+        """Load a rule set from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"Could not parse filter rules file {path}: {e}")
+        return cls.from_data(data)
+
+    def to_data(self):
+        return {"rules": [rule.to_dict() for rule in self.rules]}
+
+    def match(self, path, blueprint_actor=False):
+        """Return the rule that matches path, or None to keep the asset"""
+        # Static mesh paths will have '/Game/' but not end with '_C'
+        looks_like_blueprint = not path.endswith('.SM_') and "StaticMesh" not in path
+        rule = self._search(self._asset_matchers[looks_like_blueprint], path)
+        if rule is None and blueprint_actor:
+            rule = self._search(self._actor_matcher, path)
+        return rule
+
+    @staticmethod
+    def _search(matcher, path):
+        regex, lookup = matcher
+        if regex is None:
+            return None
+        match = regex.search(path)
+        return lookup[match.group(0)] if match else None
+
+
+def load_rule_set(path=None):
+    """Load the rule set from path, or the built-in default when path is empty"""
+    return RuleSet.load(path) if path else RuleSet.default()
@@ -0,0 +1,239 @@
+"""Incremental update of an existing output INI with stable asset indices.
+
+The update reads the asset tables and Configs= lines of the existing INI
+and a sidecar file (<output>.sources.json) recording the content hash of
+every CSV that went into each scenario. Only scenarios whose CSVs (or the
+conversion settings) changed are parsed again. The asset tables are seeded
+with the existing indices, so known assets keep their index and new ones
+are appended at the end. Unchanged scenarios keep their lines as they
+were, and scenarios that are not part of the run are left alone.
+
+The new INI is written to a temporary file and renamed over the old one,
+and not written at all when its content hash matches the existing file.
+"""
+import hashlib
+import json
+import locale
+import os
+import re
+
+from .engine import INI_SECTION, DecisionCache, OutputProfile, ProfileRun, atomic_open, format_config_entry
+from .result_cache import file_digest
+
+SIDECAR_SUFFIX = ".sources.json"
+SIDECAR_FORMAT = 1
+
+INDEX_PATTERN = re.compile(r";Index (\d+)$")
+BLUEPRINT_ASSET_PATTERN = re.compile(r"Assets=BlueprintGeneratedClass'(.*)_C'$")
+STATICMESH_ASSET_PATTERN = re.compile(r"StaticMeshAssets=StaticMesh'(.*)'$")
+CONFIG_SCENARIO_PATTERN = re.compile(r"Configs=\(Scenario=([^,]*),")
+
+
+def sidecar_path(output_file):
+    return output_file + SIDECAR_SUFFIX
+
+
+class ExistingOutput:
+    """Asset tables and per-scenario Configs= lines of an output INI"""
+
+    def __init__(self):
+        self.blueprint_assets = {}  # path -> index
+        self.staticmesh_assets = {}  # path -> index
+        # scenario -> Configs= lines with their newline, in file order
+        self.scenario_lines = {}
+        # SHA-256 of the file as it is on disk, None if there is no file
+        self.digest = None
+
+    @classmethod
+    def read(cls, path):
+        existing = cls()
+        if not os.path.isfile(path):
+            return existing
+
+        with open(path, 'rb') as f:
+            existing.digest = hashlib.sha256(f.read()).hexdigest()
+
+        index = None
+        with open(path, 'r') as f:
+            for line_num, line in enumerate(f, 1):
+                stripped = line.rstrip("\r\n")
+                if stripped.startswith("Configs="):
+                    match = CONFIG_SCENARIO_PATTERN.match(stripped)
+                    if match is None:
+                        raise ValueError(f"{path}:{line_num}: Configs= line without a scenario")
+                    existing.scenario_lines.setdefault(match.group(1), []).append(stripped + "\n")
+                    continue
+
+                match = INDEX_PATTERN.match(stripped)
+                if match is not None:
+                    index = int(match.group(1))
+                    continue
+
+                for pattern, assets in ((BLUEPRINT_ASSET_PATTERN, existing.blueprint_assets),
+                                        (STATICMESH_ASSET_PATTERN, existing.staticmesh_assets)):
+                    match = pattern.match(stripped)
+                    if match is not None:
+                        assets[match.group(1)] = index if index is not None else len(assets)
+                        index = None
+                        break
+                else:
+                    if stripped and stripped != INI_SECTION:
+                        raise ValueError(f"{path}:{line_num}: not a CustomObjects INI line: {stripped[:80]}")
+
+        # New assets are numbered from len(assets), so the tables must be 0..n-1
+        for assets in (existing.blueprint_assets, existing.staticmesh_assets):
+            if sorted(assets.values()) != list(range(len(assets))):
+                raise ValueError(f"{path}: asset indices are not numbered 0 to {len(assets) - 1}")
+        return existing
+
+
+class ScenarioLines:
+    """Sink that formats entries into Configs= lines grouped by scenario"""
+
+    def __init__(self, once=None):
+        self.once = once
+        # scenario -> Configs= lines
+        self.lines = {}
+        self.count = 0
+
+    def append(self, entry):
+        self.lines.setdefault(entry['Scenario'], []).append(format_config_entry(entry, self.once))
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+def settings_fingerprint(engine):
+    """Hash of the settings that change the Configs= lines of a scenario"""
+    options = engine.options
+    budgets = file_digest(options.budgets_file) if options.budgets_file else None
+    data = {
+        "rules": engine.rules.to_data(),
+        "add_once_to_blueprints": bool(options.add_once_to_blueprints),
+        "filter_all_blueprints": bool(options.filter_all_blueprints),
+        "dedupe": bool(options.dedupe),
+        "dedupe_tolerance": options.dedupe_tolerance if options.dedupe else 0,
+        "budgets": budgets,
+        "manifest": engine.manifest.digest if engine.manifest is not None else None,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _read_sidecar(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != SIDECAR_FORMAT:
+        return None
+    return data
+
+
+def _write_atomic(path, data):
+    """Write bytes to path through a temporary file and a rename"""
+    with atomic_open(path, 'wb') as f:
+        f.write(data)
+
+
+def _render(blueprint_assets, staticmesh_assets, scenario_order, lines):
+    """The INI as bytes, encoded the way open(path, 'w') would write it"""
+    parts = [INI_SECTION + "\n"]
+    for path, index in sorted(blueprint_assets.items(), key=lambda x: x[1]):
+        parts.append(f";Index {index}\nAssets=BlueprintGeneratedClass'{path}_C'\n")
+    for path, index in sorted(staticmesh_assets.items(), key=lambda x: x[1]):
+        parts.append(f";Index {index}\nStaticMeshAssets=StaticMesh'{path}'\n")
+    for scenario in scenario_order:
+        parts.extend(lines.get(scenario, ()))
+    text = "".join(parts)
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode(locale.getpreferredencoding(False))
+
+
+def update_output(engine, csv_files, output_file):
+    """Update output_file in place from csv_files; see the module docstring
+
+    Returns the number of scenarios that were parsed again.
+    """
+    engine.log("Starting incremental update...")
+    existing = ExistingOutput.read(output_file)
+    sidecar_file = sidecar_path(output_file)
+    sidecar = _read_sidecar(sidecar_file) if existing.digest is not None else None
+    fingerprint = settings_fingerprint(engine)
+
+    # scenario -> [(absolute csv path, content hash)] in input order
+    sources = {}
+    for csv_file, scenario in csv_files:
+        sources.setdefault(scenario, []).append([os.path.abspath(csv_file), file_digest(csv_file)])
+
+    previous = {}
+    if sidecar is None:
+        if existing.digest is not None:
+            engine.log(f"No usable {os.path.basename(sidecar_file)}, parsing every scenario again")
+    elif sidecar.get("settings") != fingerprint:
+        engine.log("Conversion settings changed, parsing every scenario again")
+    else:
+        previous = sidecar.get("scenarios", {})
+
+    # A scenario without entries has no lines in the INI, so only the
+    # recorded hashes decide what changed
+    changed = [scenario for scenario in sources if previous.get(scenario) != sources[scenario]]
+    engine.log(f"Scenarios changed: {len(changed)} of {len(sources)}")
+    for scenario in sources:
+        if scenario not in changed:
+            engine.log(f"  Unchanged: {scenario}")
+
+    # Seeded with the existing indices so known assets keep their index
+    blueprint_assets = dict(existing.blueprint_assets)
+    staticmesh_assets = dict(existing.staticmesh_assets)
+    lines = dict(existing.scenario_lines)
+
+    if changed:
+        engine.rule_hits.clear()
+        engine.skipped_assets.clear()
+        engine.file_reports = []
+        profile = OutputProfile(output_file, engine.options.add_once_to_blueprints,
+                                engine.options.filter_all_blueprints)
+        grouped = ScenarioLines(profile.once)
+        run = engine._add_sink_filters(ProfileRun(profile, grouped))
+        engine.deduper = run.deduper
+        engine.culler = run.culler
+        to_parse = [(csv_file, scenario) for csv_file, scenario in csv_files if scenario in changed]
+        engine._parse_csvs(to_parse, blueprint_assets, staticmesh_assets, run.sink, DecisionCache())
+        if run.deduper is not None:
+            engine.log_collapsed()
+        if run.culler is not None:
+            engine.log_culled()
+        engine.log_rule_hits()
+        engine.log_unknown_assets()
+        for scenario in changed:
+            lines[scenario] = grouped.lines.get(scenario, [])
+
+    new_blueprints = len(blueprint_assets) - len(existing.blueprint_assets)
+    new_staticmeshes = len(staticmesh_assets) - len(existing.staticmesh_assets)
+    engine.log(f"\nNew assets appended: {new_blueprints} blueprint, {new_staticmeshes} static mesh")
+
+    if engine.options.filter_all_blueprints and not existing.blueprint_assets:
+        # StaticMesh only: no blueprint asset table, as in a full conversion
+        blueprint_assets = {}
+
+    # Existing scenarios keep their place, new ones go at the end
+    scenario_order = list(existing.scenario_lines) + [s for s in sources if s not in existing.scenario_lines]
+    data = _render(blueprint_assets, staticmesh_assets, scenario_order, lines)
+    if existing.digest == hashlib.sha256(data).hexdigest():
+        engine.log(f"\n{output_file} is unchanged, not rewritten")
+    else:
+        _write_atomic(output_file, data)
+        engine.log(f"\nOutput written to {output_file}")
+
+    # Scenarios not in this run keep their recorded sources
+    recorded = {scenario: value for scenario, value in previous.items() if scenario not in sources}
+    recorded.update(sources)
+    sidecar_data = {"format": SIDECAR_FORMAT, "settings": fingerprint, "scenarios": recorded}
+    _write_atomic(sidecar_file, json.dumps(sidecar_data, indent=2).encode('utf-8'))
+
+    engine.log("Update completed successfully!")
+    engine._report_progress(100)
+    return len(changed)
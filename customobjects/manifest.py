@@ -0,0 +1,158 @@
+"""Asset manifest: the asset packages the server build actually ships.
+
+A manifest is a text file with one asset per line, e.g. the file listing
+of a pak file. Lines may be package paths (/Game/Props/SM_Crate), object
+paths (/Game/Props/SM_Crate.SM_Crate), file paths inside the pak
+(MyGame/Content/Props/SM_Crate.uasset) or UnrealPak -List output, where
+the path is the quoted part of the line. Blank lines and lines starting
+with '#' or ';' are ignored. Paths are compared case-insensitively, as the
+engine does.
+
+Parsing a listing of hundreds of thousands of lines takes a while, so the
+sorted package paths are cached in a binary file keyed on the manifest's
+content hash. Loading the cache is a single read; lookups are a binary
+search over the sorted paths.
+"""
+import os
+import struct
+from array import array
+
+from .engine import atomic_open
+from .filter_rules import FilterRule
+from .result_cache import default_cache_dir, file_digest
+
+# Bump when the parsing of manifest lines changes so old caches are ignored
+MANIFEST_FORMAT = 1
+
+CACHE_MAGIC = b"COMANIF1"
+_HEADER = struct.Struct("<8sI")
+
+PACKAGE_EXTENSIONS = (".uasset", ".umap", ".uexp", ".ubulk", ".uptnl")
+
+# Skips the assets that are not in the manifest
+UNKNOWN_ASSET_RULE = FilterRule("manifest:unknown", ["<not in manifest>"])
+
+
+def package_path(path):
+    """'/Game/Props/SM_Crate.SM_Crate' -> '/game/props/sm_crate'"""
+    head, _, name = path.rpartition('/')
+    return f"{head}/{name.partition('.')[0]}".lower()
+
+
+def manifest_package(line):
+    """The package path of one manifest line, or None for blank and comment lines"""
+    line = line.strip()
+    if not line or line[0] in "#;":
+        return None
+    if '"' in line:
+        # UnrealPak -List: ... "MyGame/Content/Props/SM_Crate.uasset" offset: ..., size: ...
+        line = line.split('"')[1]
+    path = line.replace('\\', '/')
+    for extension in PACKAGE_EXTENSIONS:
+        if path.lower().endswith(extension):
+            path = path[:-len(extension)]
+            break
+    if not path.startswith('/'):
+        # File path in a pak: <Project>/Content/... is mounted as /Game/...,
+        # Engine/Content/... as /Engine/... and .../Plugins/<Name>/Content/... as /<Name>/...
+        root, sep, rest = path.partition('/Content/')
+        if not sep:
+            return None
+        mount = root.rsplit('/', 1)[-1]
+        if root != "Engine" and "/Plugins/" not in f"/{root}":
+            mount = "Game"
+        path = f"/{mount}/{rest}"
+    return package_path(path)
+
+
+class AssetManifest:
+    """Sorted package paths of a manifest with binary search lookups"""
+
+    # Rule reported for the assets that are not in the manifest
+    rule = UNKNOWN_ASSET_RULE
+
+    def __init__(self, data, offsets):
+        # Sorted UTF-8 package paths back to back; entry i is data[offsets[i]:offsets[i + 1]]
+        self.data = data
+        self.offsets = offsets
+        # SHA-256 of the manifest file, set by load_manifest
+        self.digest = None
+
+    @classmethod
+    def from_lines(cls, lines):
+        packages = sorted({package.encode('utf-8') for package in map(manifest_package, lines) if package})
+        offsets = array('I', [0])
+        position = 0
+        for package in packages:
+            position += len(package)
+            offsets.append(position)
+        return cls(b"".join(packages), offsets)
+
+    @classmethod
+    def parse(cls, path):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls.from_lines(f)
+
+    @classmethod
+    def read_cache(cls, path):
+        with open(path, 'rb') as f:
+            blob = f.read()
+        magic, count = _HEADER.unpack_from(blob)
+        if magic != CACHE_MAGIC:
+            raise ValueError(f"{path} is not a manifest cache")
+        offsets = array('I')
+        start = _HEADER.size
+        end = start + (count + 1) * offsets.itemsize
+        offsets.frombytes(blob[start:end])
+        data = blob[end:]
+        if len(offsets) != count + 1 or offsets[-1] != len(data):
+            raise ValueError(f"{path} is truncated")
+        return cls(data, offsets)
+
+    def write_cache(self, path):
+        with atomic_open(path, 'wb') as f:
+            f.write(_HEADER.pack(CACHE_MAGIC, len(self)))
+            f.write(self.offsets.tobytes())
+            f.write(self.data)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def match(self, path):
+        """Return the rule that skips path when its package is not in the manifest, or None"""
+        return None if path in self else self.rule
+
+    def __contains__(self, path):
+        """True if the package of an asset path ('/Game/A/B.B_C') is in the manifest"""
+        key = package_path(path).encode('utf-8')
+        data = self.data
+        offsets = self.offsets
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if data[offsets[middle]:offsets[middle + 1]] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(offsets) - 1 and data[offsets[low]:offsets[low + 1]] == key
+
+
+def load_manifest(manifest_file, cache_dir=None):
+    """Load manifest_file through its cached index, building the cache on first use
+
+    The cache goes into cache_dir, or the per-user cache folder.
+    """
+    digest = file_digest(manifest_file)
+    cache_path = os.path.join(cache_dir or default_cache_dir(), f"manifest-{MANIFEST_FORMAT}-{digest}.idx")
+    try:
+        manifest = AssetManifest.read_cache(cache_path)
+    except (OSError, ValueError, struct.error):
+        manifest = AssetManifest.parse(manifest_file)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            manifest.write_cache(cache_path)
+        except OSError:
+            # A read-only cache folder only costs the parse on the next run
+            pass
+    manifest.digest = digest
+    return manifest
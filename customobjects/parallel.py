@@ -0,0 +1,170 @@
+"""Parallel CSV parsing in a process pool.
+
+Each work unit is a whole CSV or a byte range of a large one. Workers parse
+their unit against empty local asset tables and send back the local tables
+in first-seen order plus compact placement records. ConverterEngine then
+merges the results in input order, remapping local indices to global ones,
+which gives exactly the indices and output of a sequential run.
+"""
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from .csv_input import open_csv_source, split_ranges, supports_ranges
+from .engine import ConverterEngine, DecisionCache, FileStats
+from .progress import ConversionCancelled
+from .run_report import StageTimings
+
+# Seconds between checks of the cancel event while waiting for a worker
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class WorkUnit:
+    """One CSV file, or one byte range of it, to be parsed by a worker"""
+
+    def __init__(self, file_index, csv_file, scenario, start=0, end=None):
+        self.file_index = file_index
+        self.csv_file = csv_file
+        self.scenario = scenario
+        self.start = start
+        self.end = end
+
+
+class PlacementRecords:
+    """Stands in for config_entries in a worker, storing compact tuples"""
+
+    def __init__(self):
+        # (is_blueprint, local asset index, location, rotation)
+        self.records = []
+
+    def append(self, entry):
+        self.records.append((entry['Type'] == 'Blueprint', entry['AssetIndex'], entry['Location'],
+                             entry['Rotation']))
+
+
+class ParseResult:
+    """Everything a worker found in one work unit"""
+
+    def __init__(self, blueprint_paths, staticmesh_paths, records, stats, rule_hits, cache_hits,
+                 cache_misses, events, timings):
+        # Local asset tables, position = local index
+        self.blueprint_paths = blueprint_paths
+        self.staticmesh_paths = staticmesh_paths
+        self.records = records
+        self.stats = stats
+        self.rule_hits = rule_hits
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        # Log output to replay in order: ("log", message), ("detail", kind,
+        # message), ("problem", path) and ("row_error", row, error, mesh_cell)
+        # with row numbers relative to the unit
+        self.events = events
+        # StageTimings measured by the worker
+        self.timings = timings
+
+
+class ChunkEngine(ConverterEngine):
+    """Engine that records its log output as events instead of emitting it"""
+
+    def __init__(self, options):
+        super().__init__(options, log=self._capture_log, detail=self._capture_detail)
+        self.events = []
+
+    def parse(self, unit, tracker=None, cancel=None):
+        """Parse unit into a ParseResult
+
+        tracker is a ProgressTracker to report the bytes read within the
+        unit to, and cancel an event that stops the parse at the next batch
+        of rows with ConversionCancelled.
+        """
+        self.tracker = tracker
+        self.cancel = cancel
+        self.events = []
+        self.rule_hits = Counter()
+        self.skipped_assets = Counter()
+        self.row_messages.clear()
+        self.timings = StageTimings()
+        blueprint_assets = {}
+        staticmesh_assets = {}
+        records = PlacementRecords()
+        cache = DecisionCache()
+        stats = FileStats()
+        end = unit.end if unit.end is not None else os.path.getsize(unit.csv_file)
+        stats.bytes_read = max(0, end - unit.start)
+        self.timings.read.bytes_read = stats.bytes_read
+
+        with open_csv_source(unit.csv_file, unit.start, unit.end) as (reader, tell):
+            unit_tell = (lambda: tell() - unit.start) if tracker is not None else None
+            self._process_rows(reader, unit.scenario, blueprint_assets, staticmesh_assets, records, cache, stats,
+                               tell=unit_tell)
+
+        return ParseResult(list(blueprint_assets), list(staticmesh_assets), records.records, stats,
+                           self.rule_hits, cache.hits, cache.misses, self.events, self.timings)
+
+    def _capture_log(self, message):
+        self.events.append(("log", message))
+
+    def _capture_detail(self, kind, message):
+        self.events.append(("detail", kind, message))
+
+    def _log_problem_asset(self, mesh_path):
+        self.events.append(("problem", mesh_path))
+
+    def _row_error(self, row_num, error, mesh_cell):
+        self.events.append(("row_error", row_num, error, mesh_cell))
+
+
+# The engine of the current worker process and the event that cancels its
+# parse, set up by _init_worker
+_worker_engine = None
+_worker_cancel = None
+
+
+def _init_worker(options, cancel):
+    global _worker_engine, _worker_cancel
+    _worker_engine = ChunkEngine(options)
+    _worker_cancel = cancel
+
+
+def _parse_unit(unit):
+    return _worker_engine.parse(unit, cancel=_worker_cancel)
+
+
+def plan_units(csv_files, chunk_size):
+    """Split (csv_path, scenario) tuples into WorkUnits in input order"""
+    units = []
+    for file_index, (csv_file, scenario) in enumerate(csv_files):
+        # Compressed and UTF-16 files are always one unit
+        file_chunk_size = chunk_size if supports_ranges(csv_file) else 0
+        for start, end in split_ranges(os.path.getsize(csv_file), file_chunk_size):
+            units.append(WorkUnit(file_index, csv_file, scenario, start, end))
+    return units
+
+
+def parse_units(options, units, workers, cancel=None):
+    """Parse units in a process pool, yielding ParseResults in unit order
+
+    Once cancel (e.g. a threading.Event) is set, ConversionCancelled is
+    raised and the workers stop at their next batch of rows. Units not
+    started yet are cancelled when the caller stops early.
+    """
+    # Shared with the workers, which check it per batch of rows
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options, stop)) as pool:
+        futures = [pool.submit(_parse_unit, unit) for unit in units]
+        try:
+            for future in futures:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise ConversionCancelled("Conversion cancelled")
+                    try:
+                        result = future.result(timeout=CANCEL_POLL_INTERVAL if cancel is not None else None)
+                    except TimeoutError:
+                        continue
+                    break
+                yield result
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
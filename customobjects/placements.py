@@ -0,0 +1,106 @@
+"""Columnar in-memory store for config entries.
+
+A config entry dict with its location and rotation tuples takes several
+hundred bytes. PlacementStore keeps the same information in typed arrays
+instead: a scenario id, a flags byte (blueprint, Once), the asset index and
+the six coordinates as 32-bit integers, about 35 bytes per placement. The
+coordinates are stored as the row parser produced them, and the Configs=
+lines are only formatted when the INI is written, byte for byte as
+format_config_entry() would write them.
+
+Coordinates outside the 32-bit range move the coordinate column to 64-bit
+integers, and beyond that to a plain list, so any value round-trips.
+"""
+from array import array
+
+FLAG_BLUEPRINT = 1
+FLAG_ONCE = 2
+
+
+def _widen(values):
+    """The values in the next wider column: int32 -> int64 -> list"""
+    if isinstance(values, array) and values.typecode == 'i':
+        return array('q', values)
+    return list(values)
+
+
+class PlacementStore:
+    """Append-only config entry list kept as columns"""
+
+    def __init__(self):
+        self.scenario_names = []
+        self._scenario_ids = {}
+        self.scenarios = array('H')
+        self.flags = array('B')
+        self.asset_indices = array('I')
+        # x, y, z, roll, pitch, yaw per placement
+        self.coords = array('i')
+
+    def append(self, entry):
+        scenario = entry['Scenario']
+        scenario_id = self._scenario_ids.get(scenario)
+        if scenario_id is None:
+            scenario_id = self._scenario_ids[scenario] = len(self.scenario_names)
+            self.scenario_names.append(scenario)
+            if scenario_id > 0xFFFF and self.scenarios.typecode == 'H':
+                self.scenarios = array('I', self.scenarios)
+
+        coords = self.coords
+        try:
+            coords.extend(entry['Location'])
+            coords.extend(entry['Rotation'])
+        except OverflowError:
+            # Drop the part of this placement that did fit
+            del coords[len(self.flags) * 6:]
+            self.coords = _widen(coords)
+            self.append(entry)
+            return
+
+        flags = 0
+        if entry['Type'] == 'Blueprint':
+            flags = FLAG_BLUEPRINT | (FLAG_ONCE if entry.get('Once') else 0)
+        self.scenarios.append(scenario_id)
+        self.flags.append(flags)
+        self.asset_indices.append(entry['AssetIndex'])
+
+    def __len__(self):
+        return len(self.flags)
+
+    def __iter__(self):
+        """The entries as dicts, as they were appended"""
+        names = self.scenario_names
+        coords = iter(self.coords)
+        for scenario_id, flags, index, x, y, z, roll, pitch, yaw in zip(
+                self.scenarios, self.flags, self.asset_indices, coords, coords, coords, coords, coords, coords):
+            entry = {
+                'Scenario': names[scenario_id],
+                'Type': 'Blueprint' if flags & FLAG_BLUEPRINT else 'StaticMesh',
+                'AssetIndex': index,
+                'Location': (x, y, z),
+                'Rotation': (roll, pitch, yaw),
+            }
+            if flags & FLAG_ONCE:
+                entry['Once'] = True
+            yield entry
+
+    def lines(self, once=None):
+        """Yield the Configs= lines; once works as in format_config_entry"""
+        # Line start and end for every (scenario, flags) combination
+        prefixes = {}
+        for scenario_id, name in enumerate(self.scenario_names):
+            for flags in (0, FLAG_BLUEPRINT, FLAG_BLUEPRINT | FLAG_ONCE):
+                blueprint = flags & FLAG_BLUEPRINT
+                add_once = bool(flags & FLAG_ONCE) if once is None else bool(once and blueprint)
+                entry_type = 'Blueprint' if blueprint else 'StaticMesh'
+                prefixes[scenario_id, flags] = (f"Configs=(Scenario={name}, Type={entry_type}, AssetIndex=",
+                                                ", Once)\n" if add_once else ")\n")
+
+        coords = iter(self.coords)
+        for scenario_id, flags, index, x, y, z, roll, pitch, yaw in zip(
+                self.scenarios, self.flags, self.asset_indices, coords, coords, coords, coords, coords, coords):
+            start, end = prefixes[scenario_id, flags]
+            yield f"{start}{index}, Location={x};{y};{z}, Rotation={roll};{pitch};{yaw}{end}"
+
+    def write_to(self, f, once=None):
+        """Write every Configs= line to the text file f"""
+        f.writelines(self.lines(once))
@@ -0,0 +1,308 @@
+"""Sampled dry-run preview of a conversion.
+
+Instead of reading every row, the preview parses a few evenly spaced
+windows of each CSV: byte ranges that start at seeked offsets and are
+resynchronized on row boundaries the way worker ranges are. The rows go
+through the same parsing and filter code as a conversion, and the counts
+are scaled up to the whole file with a ratio estimator (counts per byte
+read times the file size). The spread of the counts between windows
+gives a 95% margin of error for every number.
+
+Files small enough to fit the sample are parsed whole and their numbers
+are exact. Compressed and UTF-16 files can't be entered at an offset, so
+only their first rows are sampled and their numbers are rougher. Dedupe
+and budgets are not applied: they depend on every row of a scenario, so
+the preview shows the placements before them.
+"""
+import math
+import os
+import time
+from itertools import islice
+
+from .csv_input import open_csv_rows, open_csv_source, supports_ranges
+from .engine import INI_SECTION, DecisionCache, FileStats, format_config_entry
+from .parallel import ChunkEngine
+
+# Bytes sampled over all CSVs together; a few MB parse in well under a second
+DEFAULT_SAMPLE_BYTES = 4 * 1024 * 1024
+
+# Size of one sampled window; the margins need a few windows per file
+WINDOW_SIZE = 64 * 1024
+MIN_WINDOWS = 4
+# Rows per window when only the start of a file can be read
+HEAD_BLOCK_ROWS = 256
+
+# Two-sided 95% normal quantile
+Z_95 = 1.96
+
+# Counts estimated per scenario, with their labels
+METRICS = (
+    ("rows", "Rows"),
+    ("included", "Placements"),
+    ("staticmeshes", "StaticMesh"),
+    ("blueprints", "Blueprint"),
+    ("skipped", "Skipped by filters"),
+    ("skipped_blueprints", "Skipped blueprints (StaticMesh only)"),
+    ("origin_skipped", "At origin"),
+    ("errors", "Row errors"),
+)
+
+
+class Estimate:
+    """An extrapolated count and its 95% margin of error"""
+
+    __slots__ = ("value", "margin")
+
+    def __init__(self, value=0.0, margin=0.0):
+        self.value = value
+        self.margin = margin
+
+    def __add__(self, other):
+        # Files are sampled independently, so the variances add up
+        return Estimate(self.value + other.value, math.hypot(self.margin, other.margin))
+
+    def __str__(self):
+        if not self.margin:
+            return f"{round(self.value):,}"
+        return f"{round(self.value):,} ± {math.ceil(self.margin):,}"
+
+
+def ratio_estimate(windows, total_bytes, sampled_bytes):
+    """Scale (window bytes, count) samples up to total_bytes
+
+    Counts per byte over all windows times the total; the margin comes from
+    the variance of the ratio estimator between windows, with the finite
+    population correction so a fully read file has no margin.
+    """
+    if not sampled_bytes:
+        return Estimate()
+    count = sum(value for _, value in windows)
+    ratio = count / sampled_bytes
+    value = ratio * total_bytes
+    n = len(windows)
+    fraction = min(1.0, sampled_bytes / total_bytes) if total_bytes else 1.0
+    if fraction >= 1.0:
+        return Estimate(count)
+    if n < 2:
+        return Estimate(value, value)
+    mean_bytes = sampled_bytes / n
+    residuals = sum((value_i - ratio * bytes_i) ** 2 for bytes_i, value_i in windows)
+    variance = (1 - fraction) * residuals / (n * (n - 1) * mean_bytes ** 2)
+    return Estimate(value, Z_95 * total_bytes * math.sqrt(variance))
+
+
+class LineBytes:
+    """Sink that adds up the size of the Configs= lines instead of keeping them"""
+
+    def __init__(self, once):
+        self.once = once
+        self.size = 0
+        # A \r\n line end on Windows adds a byte per line
+        self._extra = len(os.linesep) - 1
+
+    def append(self, entry):
+        self.size += len(format_config_entry(entry, self.once)) + self._extra
+
+
+class FileSample:
+    """The windows of one CSV that were parsed: (bytes, FileStats, line bytes) each"""
+
+    def __init__(self, csv_file, scenario, size):
+        self.csv_file = csv_file
+        self.scenario = scenario
+        self.size = size
+        self.windows = []
+        # Read whole, so the counts are exact
+        self.exact = False
+        # Only the first rows could be read
+        self.head_only = False
+
+    @property
+    def sampled_bytes(self):
+        return sum(size for size, _, _ in self.windows)
+
+    def estimate(self, get):
+        """Estimate of get(stats, line_bytes) over the whole file"""
+        windows = [(size, get(stats, line_bytes)) for size, stats, line_bytes in self.windows]
+        if self.exact:
+            return Estimate(sum(value for _, value in windows))
+        return ratio_estimate(windows, self.size, self.sampled_bytes)
+
+
+class ConversionPreview:
+    """Estimated counts per scenario and in total"""
+
+    def __init__(self, samples, blueprint_assets, staticmesh_assets, filter_all_blueprints, seconds):
+        self.samples = samples
+        self.seconds = seconds
+        self.total_bytes = sum(sample.size for sample in samples)
+        self.sampled_bytes = sum(sample.sampled_bytes for sample in samples)
+        self.exact = all(sample.exact for sample in samples)
+        # Unique assets seen in the sample; the whole files can only have more
+        self.blueprint_assets = 0 if filter_all_blueprints else len(blueprint_assets)
+        self.staticmesh_assets = len(staticmesh_assets)
+
+        # scenario -> {metric: Estimate}, in input order
+        self.scenarios = {}
+        rule_names = sorted({name for sample in samples for _, stats, _ in sample.windows
+                             for name in stats.rule_hits})
+        for sample in samples:
+            totals = self.scenarios.setdefault(sample.scenario, {})
+            for name, _ in METRICS:
+                estimate = sample.estimate(lambda stats, _, name=name: getattr(stats, name))
+                totals[name] = totals.get(name, Estimate()) + estimate
+        # rule name -> Estimate of the rows it skips
+        self.rule_hits = {}
+        for name in rule_names:
+            total = Estimate()
+            for sample in samples:
+                total = total + sample.estimate(lambda stats, _, name=name: stats.rule_hits.get(name, 0))
+            self.rule_hits[name] = total
+
+        # Asset tables of the unique assets seen, plus the extrapolated Configs= lines
+        self.ini_bytes = Estimate(_table_bytes({} if filter_all_blueprints else blueprint_assets, staticmesh_assets))
+        for sample in samples:
+            self.ini_bytes = self.ini_bytes + sample.estimate(lambda _, line_bytes: line_bytes)
+
+    def total(self, metric):
+        total = Estimate()
+        for totals in self.scenarios.values():
+            total = total + totals[metric]
+        return total
+
+    def lines(self):
+        """The preview as text lines"""
+        read_mb = self.sampled_bytes / (1024 * 1024)
+        total_mb = self.total_bytes / (1024 * 1024)
+        if self.exact:
+            lines = [f"Preview: every row read ({total_mb:.1f} MB) in {self.seconds:.2f}s, counts are exact"]
+        else:
+            lines = [f"Preview: sampled {read_mb:.1f} of {total_mb:.1f} MB in {self.seconds:.2f}s, "
+                     f"estimates with 95% margins"]
+        head_only = [os.path.basename(sample.csv_file) for sample in self.samples if sample.head_only]
+        if head_only:
+            lines.append(f"  Only the first rows of {', '.join(head_only)} were sampled (compressed or UTF-16)")
+        for scenario, totals in self.scenarios.items():
+            lines.append(f"{scenario}: {totals['included']} placements "
+                         f"(StaticMesh: {totals['staticmeshes']}, Blueprint: {totals['blueprints']})")
+        lines.append("Total:")
+        for name, label in METRICS:
+            total = self.total(name)
+            if total.value or name in ("rows", "included"):
+                lines.append(f"  {label}: {total}")
+        if self.rule_hits:
+            lines.append("Filter rule hits:")
+            for name, estimate in sorted(self.rule_hits.items(), key=lambda x: (-x[1].value, x[0])):
+                lines.append(f"  {name}: {estimate}")
+        more = "" if self.exact else " (at least)"
+        lines.append(f"Unique assets{more}: {self.blueprint_assets + self.staticmesh_assets} "
+                     f"(Blueprint: {self.blueprint_assets}, StaticMesh: {self.staticmesh_assets})")
+        size = self.ini_bytes
+        lines.append(f"Output INI size: {size.value / (1024 * 1024):.2f} MB"
+                     + (f" ± {size.margin / (1024 * 1024):.2f} MB" if size.margin else ""))
+        return lines
+
+
+class RowSizes:
+    """Passes rows through, adding up their approximate size in the CSV"""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.size = 0
+
+    def __iter__(self):
+        for row in self.reader:
+            # Cells plus separators, ignoring quotes
+            self.size += sum(map(len, row)) + len(row)
+            yield row
+
+
+def _table_bytes(blueprint_assets, staticmesh_assets):
+    """Size of the section header and asset tables as write_ini writes them"""
+    size = len(INI_SECTION) + 1
+    for path, index in blueprint_assets.items():
+        size += len(f";Index {index}\nAssets=BlueprintGeneratedClass'{path}_C'\n")
+    for path, index in staticmesh_assets.items():
+        size += len(f";Index {index}\nStaticMeshAssets=StaticMesh'{path}'\n")
+    lines = 1 + 2 * (len(blueprint_assets) + len(staticmesh_assets))
+    return size + lines * (len(os.linesep) - 1)
+
+
+def _window_ranges(size, windows):
+    """Evenly spaced (start, end) ranges of WINDOW_SIZE, the first at the start of the file"""
+    stride = size / windows
+    return [(int(i * stride), int(i * stride) + WINDOW_SIZE) for i in range(windows)]
+
+
+def _parse_window(parser, reader, scenario, blueprint_assets, staticmesh_assets, cache, once):
+    stats = FileStats()
+    lines = LineBytes(once)
+    parser._process_rows(reader, scenario, blueprint_assets, staticmesh_assets, lines, cache, stats)
+    return stats, lines.size
+
+
+def sample_file(parser, csv_file, scenario, budget, blueprint_assets, staticmesh_assets, cache, once):
+    """Parse windows of about budget bytes in total from csv_file into a FileSample"""
+    size = os.path.getsize(csv_file)
+    sample = FileSample(csv_file, scenario, size)
+    args = (scenario, blueprint_assets, staticmesh_assets, cache, once)
+
+    windows = max(MIN_WINDOWS, budget // WINDOW_SIZE)
+    ranges = supports_ranges(csv_file)
+    if ranges and size <= max(budget, windows * WINDOW_SIZE):
+        # Windows would cover the whole file anyway
+        with open_csv_rows(csv_file) as reader:
+            stats, line_bytes = _parse_window(parser, reader, *args)
+        sample.windows.append((size, stats, line_bytes))
+        sample.exact = True
+        return sample
+
+    if ranges:
+        for start, end in _window_ranges(size, windows):
+            with open_csv_rows(csv_file, start, end) as reader:
+                stats, line_bytes = _parse_window(parser, reader, *args)
+            sample.windows.append((min(end, size) - start, stats, line_bytes))
+        return sample
+
+    # Compressed or UTF-16: read blocks of rows from the start of the file
+    # until about budget bytes of rows were read
+    sample.head_only = True
+    blocks = []
+    with open_csv_source(csv_file) as (reader, tell):
+        rows = RowSizes(reader)
+        while rows.size < budget or not blocks:
+            stats, line_bytes = _parse_window(parser, islice(rows, HEAD_BLOCK_ROWS), *args)
+            if not stats.rows:
+                break
+            blocks.append((stats, line_bytes))
+        position = tell()
+        exhausted = next(reader, None) is None
+    total_rows = sum(stats.rows for stats, _ in blocks) or 1
+    # The bytes on disk are only known for the whole head; share them out by rows
+    sample.windows = [(position * stats.rows / total_rows, stats, line_bytes) for stats, line_bytes in blocks]
+    sample.exact = exhausted
+    return sample
+
+
+def preview_conversion(engine, csv_files, sample_bytes=DEFAULT_SAMPLE_BYTES):
+    """Estimate what converting csv_files with engine's options would produce
+
+    sample_bytes is shared out over the files by their size.
+    """
+    started = time.perf_counter()
+    options = engine.options
+    parser = ChunkEngine(options)
+    sizes = [os.path.getsize(csv_file) for csv_file, _ in csv_files]
+    total_size = sum(sizes) or 1
+    blueprint_assets = {}
+    staticmesh_assets = {}
+    cache = DecisionCache()
+    once = options.add_once_to_blueprints
+    samples = []
+    for (csv_file, scenario), size in zip(csv_files, sizes):
+        engine._check_cancelled()
+        budget = max(MIN_WINDOWS * WINDOW_SIZE, int(sample_bytes * size / total_size))
+        samples.append(sample_file(parser, csv_file, scenario, budget, blueprint_assets, staticmesh_assets,
+                                   cache, once))
+    return ConversionPreview(samples, blueprint_assets, staticmesh_assets, options.filter_all_blueprints,
+                             time.perf_counter() - started)
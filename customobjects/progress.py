@@ -0,0 +1,88 @@
+"""Byte-based progress, throughput and ETA of a conversion.
+
+Progress is measured in bytes of CSV input read, weighted over the total
+size of all inputs, so one huge file moves the bar as steadily as many
+small ones. Updates are throttled to MIN_INTERVAL so reporting costs
+nothing noticeable however often the parser calls in.
+"""
+import time
+
+# Seconds between two reported updates
+MIN_INTERVAL = 0.2
+
+
+class ConversionCancelled(Exception):
+    """Raised when a conversion was cancelled before its output was written"""
+
+
+def format_duration(seconds):
+    seconds = int(seconds + 0.5)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class ProgressTracker:
+    """Turns bytes and rows read into progress(percent) and status(text) calls"""
+
+    def __init__(self, total_bytes, progress=None, status=None, min_interval=MIN_INTERVAL):
+        self.total_bytes = total_bytes
+        # progress(percent) and status(text), either may be None
+        self.progress = progress
+        self.status = status
+        self.min_interval = min_interval
+        self.started = time.perf_counter()
+        # Bytes of the files done so far, and of the current file
+        self.base = 0
+        self.position = 0
+        self.rows = 0
+        self._last_report = 0.0
+
+    @property
+    def done(self):
+        return min(self.base + self.position, self.total_bytes)
+
+    def start_file(self):
+        """Count the current file as done and start on the next one"""
+        self.base += self.position
+        self.position = 0
+
+    def advance(self, size, rows=0):
+        """Add size bytes and rows read as one piece, e.g. a merged work unit
+
+        Replaces what update() reported within the piece while it was read.
+        """
+        self.base += size
+        self.position = 0
+        self.rows += rows
+        self.report()
+
+    def update(self, position, rows):
+        """Set the byte offset reached in the current file and add rows read"""
+        self.position = position
+        self.rows += rows
+        self.report()
+
+    def report(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.min_interval:
+            return
+        self._last_report = now
+        if self.progress is not None:
+            self.progress(self.percent())
+        if self.status is not None:
+            self.status(self.summary(now))
+
+    def percent(self):
+        return (self.done / self.total_bytes) * 100 if self.total_bytes else 100.0
+
+    def summary(self, now=None):
+        """e.g. "26% (12.5 of 48.0 MB), 85,200 rows/s, ETA 0:42" """
+        elapsed = (now if now is not None else time.perf_counter()) - self.started
+        done = self.done
+        text = f"{self.percent():.0f}% ({done / (1024 * 1024):.1f} of {self.total_bytes / (1024 * 1024):.1f} MB)"
+        if elapsed > 0:
+            text += f", {int(self.rows / elapsed):,} rows/s"
+        if done and elapsed > 0:
+            text += f", ETA {format_duration((self.total_bytes - done) * elapsed / done)}"
+        return text
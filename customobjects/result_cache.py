@@ -0,0 +1,146 @@
+"""On-disk cache of parsed CSV results for incremental conversions.
+
+Each work unit (a whole CSV, or a byte range of one when parsing in
+parallel) is stored as a pickled ParseResult. The key covers everything
+the parse depends on: the file's content hash, the byte range, the filter
+rule set, the asset manifest and the "filter out ALL blueprints" option.
+Scenario names and the "Once" option are applied when results are merged,
+so they are not part of the key and changing them reuses the cached parse.
+
+The cache is capped in bytes; the least recently used entries are removed
+first. Entry files are touched on every hit so their mtime is the LRU order.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+# Bump when ParseResult or the parsing rules change so old entries are ignored
+CACHE_FORMAT = 4
+
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# Block size for hashing CSV files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+ENTRY_SUFFIX = ".result"
+
+
+def default_cache_dir():
+    """Per-user cache directory used by the GUI"""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "customobjects")
+
+
+def file_digest(path):
+    """SHA-256 of the contents of path"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Directory of cached ParseResults with LRU eviction"""
+
+    def __init__(self, directory, options, rules, max_size=DEFAULT_CACHE_SIZE, manifest_digest=None):
+        self.directory = directory
+        self.max_size = max_size
+        # Everything except the file contents and range that a parse depends on;
+        # manifest_digest is the hash of the asset manifest in use, if any
+        self._settings = json.dumps({
+            "format": CACHE_FORMAT,
+            "rules": rules.to_data(),
+            "filter_all_blueprints": bool(options.filter_all_blueprints),
+            "manifest": manifest_digest,
+        }, sort_keys=True)
+        # csv path -> content hash, so split files are hashed once per run
+        self._digests = {}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, unit):
+        digest = self._digests.get(unit.csv_file)
+        if digest is None:
+            digest = self._digests[unit.csv_file] = file_digest(unit.csv_file)
+        text = f"{self._settings}\n{digest}\n{unit.start}\n{unit.end}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def touch(self, key):
+        """Mark the entry for key as recently used; False when there is none
+
+        Entries are touched before the run starts merging so that evictions
+        caused by new entries do not remove ones the run still needs. A hit
+        is only counted once load() has read the entry.
+        """
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            self.misses += 1
+            return False
+        return True
+
+    def load(self, key):
+        """Return the cached ParseResult for key, or None (counted as a miss)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or from an incompatible version: drop it and parse again
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store result under key, then evict old entries over the size cap"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_size"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    def summary(self):
+        return f"Result cache: {self.hits} work unit(s) reused, {self.misses} parsed"
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
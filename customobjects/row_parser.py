@@ -0,0 +1,139 @@
+"""Parsing of the individual cells of an actor dump row.
+
+All patterns are compiled once at import time and each cell is parsed
+with a single match. Coordinates are rounded with round(float(value)),
+which is the same banker's rounding as the int(round(float(value))) the
+converter has always used.
+
+parse_locations() converts a whole batch of location cells at once. When
+NumPy is installed the float conversion and rounding run vectorised;
+otherwise a tight pure Python loop is used. Both give identical results.
+"""
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+LOCATION_PATTERN = re.compile(r"X=([-\d.]+),Y=([-\d.]+),Z=([-\d.]+)")
+ROTATION_PATTERN = re.compile(r"Pitch=([-\d.]+),Yaw=([-\d.]+),Roll=([-\d.]+)")
+MESH_PATTERN = re.compile(r"StaticMesh'(.+?)'")
+BLUEPRINT_PATTERN = re.compile(r"(?:DynamicClass|BlueprintGeneratedClass)'(.+?)'")
+
+# float64 holds every integer up to 2**53 exactly; beyond that fall back to
+# Python ints so huge coordinates round exactly like round(float(x))
+_NUMPY_EXACT_LIMIT = 2.0 ** 53
+
+
+def parse_mesh_path(meshes_str):
+    """Parse static mesh path from meshes string"""
+    match = MESH_PATTERN.search(meshes_str)
+    return match.group(1) if match else None
+
+
+def parse_blueprint_path(actor_str):
+    """Parse blueprint path from a DynamicClass or BlueprintGeneratedClass actor string"""
+    match = BLUEPRINT_PATTERN.search(actor_str)
+    return match.group(1) if match else None
+
+
+def parse_location(location_str):
+    """Parse a location cell as "x;y;z", or None if missing or at the origin"""
+    match = LOCATION_PATTERN.search(location_str)
+    if match is None:
+        return None
+    x, y, z = match.groups()
+    x = round(float(x))
+    y = round(float(y))
+    z = round(float(z))
+
+    # Skip if location is at origin (0,0,0)
+    if x == 0 and y == 0 and z == 0:
+        return None
+    return f"{x};{y};{z}"
+
+
+def parse_rotation(rotation_str):
+    """Parse a rotation cell in Roll;Pitch;Yaw order, the correct mapping for CustomObjects"""
+    roll, pitch, yaw = parse_rotation_values(rotation_str)
+    return f"{roll};{pitch};{yaw}"
+
+
+def parse_rotation_values(rotation_str):
+    """Parse a rotation cell as a (roll, pitch, yaw) tuple of ints"""
+    match = ROTATION_PATTERN.search(rotation_str)
+    if match is None:
+        return (0, 0, 0)
+    pitch, yaw, roll = match.groups()
+    return (round(float(roll)), round(float(pitch)), round(float(yaw)))
+
+
+def parse_locations(location_strs, use_numpy=None):
+    """Parse a batch of location cells
+
+    Returns one result per cell: an (x, y, z) tuple of ints, None (no
+    location or at the origin) or the exception parse_location() would
+    have raised (ValueError, or OverflowError for a value too large for a
+    float).
+    use_numpy=None uses NumPy when it is installed.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy and location_strs:
+        results = _parse_locations_numpy(location_strs)
+        if results is not None:
+            return results
+    return _parse_locations_python(location_strs)
+
+
+def _parse_locations_python(location_strs):
+    search = LOCATION_PATTERN.search
+    results = []
+    append = results.append
+    for location_str in location_strs:
+        match = search(location_str)
+        if match is None:
+            append(None)
+            continue
+        x, y, z = match.groups()
+        try:
+            x = round(float(x))
+            y = round(float(y))
+            z = round(float(z))
+        except (ValueError, OverflowError) as e:
+            append(e)
+            continue
+        append(None if x == 0 and y == 0 and z == 0 else (x, y, z))
+    return results
+
+
+def _parse_locations_numpy(location_strs):
+    """Vectorised parse_locations; None means use the Python loop instead"""
+    search = LOCATION_PATTERN.search
+    matched = []
+    values = []
+    for i, location_str in enumerate(location_strs):
+        match = search(location_str)
+        if match is not None:
+            matched.append(i)
+            values.extend(match.groups())
+    if not matched:
+        return [None] * len(location_strs)
+
+    try:
+        coords = numpy.array(values, dtype=numpy.float64)
+    except ValueError:
+        # A malformed number somewhere: let the Python loop report it per cell
+        return None
+    if not numpy.isfinite(coords).all() or numpy.abs(coords).max() >= _NUMPY_EXACT_LIMIT:
+        # Oversized values overflow to infinity; the Python loop reports them per cell
+        return None
+
+    # rint rounds half to even exactly like round()
+    coords = iter(numpy.rint(coords).astype(numpy.int64).tolist())
+    results = [None] * len(location_strs)
+    for i, x, y, z in zip(matched, coords, coords, coords):
+        if x or y or z:
+            results[i] = (x, y, z)
+    return results
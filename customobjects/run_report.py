@@ -0,0 +1,144 @@
+"""Per-stage timings and the JSON run report written next to the output.
+
+Stages of a conversion:
+    read      opening the CSVs and reading rows with csv.reader
+    parse     regex parsing of location, rotation, actor and mesh cells
+    filter    evaluating the filter rules on each unique asset
+    index     deduplicating assets and assigning their indices
+    assemble  building the config entries for the kept rows
+    merge     loading cached results and merging worker results
+    write     writing the INI
+
+Timings are collected per batch of rows or per unique asset, not per row,
+so they cost next to nothing. In parallel runs the stages done by the
+workers are summed over all workers, so they can add up to more than the
+wall time.
+"""
+import json
+import os
+import time
+
+STAGES = ("read", "parse", "filter", "index", "assemble", "merge", "write")
+
+
+class Stage:
+    """Wall time and volume of one stage"""
+
+    __slots__ = ("seconds", "rows", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def to_dict(self):
+        return {"seconds": round(self.seconds, 6), "rows": self.rows, "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written}
+
+
+class StageTimings:
+    """One Stage attribute per name in STAGES"""
+
+    def __init__(self):
+        for name in STAGES:
+            setattr(self, name, Stage())
+
+    def update(self, other):
+        """Add the stages of other, e.g. those measured by a worker"""
+        for name in STAGES:
+            mine = getattr(self, name)
+            theirs = getattr(other, name)
+            for field in Stage.__slots__:
+                setattr(mine, field, getattr(mine, field) + getattr(theirs, field))
+
+    def to_dict(self):
+        return {name: getattr(self, name).to_dict() for name in STAGES}
+
+
+def report_path(output_file):
+    """Run report file for an output INI: the same name with .report.json"""
+    return os.path.splitext(output_file)[0] + ".report.json"
+
+
+def _file_entry(csv_file, scenario, stats):
+    return {
+        "csv": csv_file,
+        "scenario": scenario,
+        "rows": stats.rows,
+        "bytes_read": stats.bytes_read,
+        "included": stats.included,
+        "staticmeshes": stats.staticmeshes,
+        "blueprints": stats.blueprints,
+        "skipped": stats.skipped,
+        "skipped_by_rule": dict(stats.rule_hits),
+        "skipped_blueprints": stats.skipped_blueprints,
+        "origin_skipped": stats.origin_skipped,
+        "errors": stats.errors,
+    }
+
+
+def build_run_report(engine, output_file, started, seconds, runs=()):
+    """Collect the last run of engine into a JSON-ready dict
+
+    runs are the ProfileRuns of the conversion; collapsed and culled counts
+    per scenario are those of the first one.
+    """
+    files = [_file_entry(csv_file, scenario, stats) for csv_file, scenario, stats in engine.file_reports]
+
+    # Several CSVs can share a scenario, so sum them up per scenario too
+    scenarios = {}
+    for entry in files:
+        total = scenarios.setdefault(entry["scenario"], {"files": 0, "skipped_by_rule": {}})
+        total["files"] += 1
+        for key, value in entry.items():
+            if key == "skipped_by_rule":
+                for name, count in value.items():
+                    total[key][name] = total[key].get(name, 0) + count
+            elif isinstance(value, int):
+                total[key] = total.get(key, 0) + value
+
+    collapsed = dict(engine.deduper.collapsed) if engine.deduper is not None else {}
+    culled = engine.culler.culled_by_scenario() if engine.culler is not None else {}
+    for scenario, total in scenarios.items():
+        total["collapsed_duplicates"] = collapsed.get(scenario, 0)
+        total["culled"] = culled.get(scenario, {})
+
+    options = engine.options
+    return {
+        "output": output_file,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "seconds": round(seconds, 6),
+        "options": {
+            "add_once_to_blueprints": options.add_once_to_blueprints,
+            "filter_all_blueprints": options.filter_all_blueprints,
+            "rules_file": options.rules_file,
+            "streaming": options.streaming,
+            "workers": options.workers,
+            "cache_dir": options.cache_dir,
+            "dedupe": options.dedupe,
+            "dedupe_tolerance": options.dedupe_tolerance,
+            "budgets_file": options.budgets_file,
+            "index_db": options.index_db,
+            "manifest_file": options.manifest_file,
+        },
+        "stages": engine.timings.to_dict(),
+        "rule_hits": dict(engine.rule_hits),
+        "profiles": [{
+            "name": run.profile.name,
+            "output": run.profile.output_file,
+            "shard_dir": run.profile.shard_dir,
+            "add_once_to_blueprints": run.profile.add_once_to_blueprints,
+            "filter_all_blueprints": run.profile.filter_all_blueprints,
+            "entries": len(run.entries),
+            "collapsed_duplicates": run.deduper.total_collapsed if run.deduper is not None else 0,
+            "culled": run.culler.total_culled if run.culler is not None else 0,
+        } for run in runs],
+        "scenarios": scenarios,
+        "files": files,
+    }
+
+
+def write_run_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,207 @@
+"""Scenario-sharded output: one INI per scenario.
+
+Each shard has a compact asset index table holding only the assets its
+scenario uses, numbered in the order the scenario first uses them. Entries
+are kept with the local indices as they arrive, in a PlacementStore, or in
+low memory mode as formatted lines in a temporary spool per shard. Shards are written concurrently by a thread pool into
+temporary files; a shard whose content did not change is left untouched,
+so only the scenarios that changed get a new file. The names of the
+shards written are recorded in a list file in the shard directory; shards
+recorded by an earlier run whose scenario is no longer converted are
+removed, so a server loading every INI in the folder doesn't pick up stale
+placements. Other files in the directory are never touched.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import INI_SECTION, WRITE_BUFFER_SIZE, atomic_open, format_config_entry
+from .placements import PlacementStore
+
+# Concurrent shard writers
+MAX_WRITERS = 8
+
+# Names of the shards written by the last run, in the shard directory
+SHARD_LIST_FILE = ".customobjects-shards.json"
+
+
+def shard_file_name(scenario):
+    """File name of a scenario's shard
+
+    Unsafe characters are replaced, and a name that had to be changed gets
+    a short hash of the scenario so that "A B" and "A_B" don't share a file.
+    """
+    name = re.sub(r'[^\w.-]', '_', scenario)
+    if name != scenario:
+        name += "_" + hashlib.sha1(scenario.encode('utf-8')).hexdigest()[:8]
+    return name + ".ini"
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class Shard:
+    """Entries and compact asset tables of one scenario"""
+
+    def __init__(self, scenario, spool_dir=None, streaming=False):
+        self.scenario = scenario
+        # global index -> local index, in first-use order
+        self.blueprints = {}
+        self.staticmeshes = {}
+        self.count = 0
+        if streaming:
+            self._entries = None
+            self._spool = tempfile.TemporaryFile(mode='w+', dir=spool_dir, encoding='utf-8', newline='\n',
+                                                 prefix="customobjects-", suffix=".shard")
+        else:
+            self._entries = PlacementStore()
+            self._spool = None
+
+    def append(self, entry, once):
+        assets = self.blueprints if entry['Type'] == 'Blueprint' else self.staticmeshes
+        index = assets.get(entry['AssetIndex'])
+        if index is None:
+            index = assets[entry['AssetIndex']] = len(assets)
+        if self._spool is not None:
+            self._spool.write(format_config_entry(dict(entry, AssetIndex=index), once))
+        else:
+            self._entries.append(dict(entry, AssetIndex=index))
+        self.count += 1
+
+    def write(self, f, blueprint_paths, staticmesh_paths, once=None):
+        """Write the shard to the text file f; blueprint_paths/staticmesh_paths list paths by global index"""
+        header = [INI_SECTION + "\n"]
+        for global_index, index in self.blueprints.items():
+            header.append(f";Index {index}\nAssets=BlueprintGeneratedClass'{blueprint_paths[global_index]}_C'\n")
+        for global_index, index in self.staticmeshes.items():
+            header.append(f";Index {index}\nStaticMeshAssets=StaticMesh'{staticmesh_paths[global_index]}'\n")
+        f.writelines(header)
+        if self._spool is not None:
+            self._spool.flush()
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, f, WRITE_BUFFER_SIZE)
+        else:
+            self._entries.write_to(f, once)
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+
+
+class ScenarioShards:
+    """Sink that routes entries to per-scenario shards and an optional combined target"""
+
+    def __init__(self, directory, combined=None, once=None, streaming=False):
+        self.directory = directory
+        # List or SpooledConfigWriter for the combined INI, or None
+        self.combined = combined
+        self.once = once
+        self.streaming = streaming
+        # scenario -> Shard, in first-seen order
+        self.shards = {}
+        self.count = 0
+
+    def append(self, entry):
+        if self.combined is not None:
+            self.combined.append(entry)
+        shard = self.shards.get(entry['Scenario'])
+        if shard is None:
+            shard = self.shards[entry['Scenario']] = Shard(entry['Scenario'], self.directory, self.streaming)
+        shard.append(entry, self.once)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def write(self, blueprint_assets, staticmesh_assets):
+        """Write every shard concurrently and remove stale ones
+
+        Returns the (changed, unchanged, removed) file paths.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        blueprint_paths = _paths_by_index(blueprint_assets)
+        staticmesh_paths = _paths_by_index(staticmesh_assets)
+        shards = list(self.shards.values())
+        paths = self.shard_paths()
+
+        results = []
+        if shards:
+            with ThreadPoolExecutor(max_workers=min(MAX_WRITERS, len(shards))) as pool:
+                results = list(pool.map(
+                    lambda shard: self._write_shard(shard, paths[shard.scenario], blueprint_paths, staticmesh_paths),
+                    shards))
+        changed = [path for path, was_changed in results if was_changed]
+        unchanged = [path for path, was_changed in results if not was_changed]
+        return changed, unchanged, self._remove_stale(paths.values())
+
+    def shard_paths(self):
+        """scenario -> shard file path; raises ValueError if two scenarios would share a file"""
+        paths = {}
+        # Compared case-insensitively, as on Windows
+        owners = {}
+        for scenario in self.shards:
+            name = shard_file_name(scenario)
+            other = owners.setdefault(name.lower(), scenario)
+            if other != scenario:
+                raise ValueError(f"Scenarios {other!r} and {scenario!r} would both be written to the shard {name}")
+            paths[scenario] = os.path.join(self.directory, name)
+        return paths
+
+    def _write_shard(self, shard, path, blueprint_paths, staticmesh_paths):
+        before = _file_signature(path)
+        with atomic_open(path, 'w', buffering=WRITE_BUFFER_SIZE, keep_unchanged=True) as f:
+            shard.write(f, blueprint_paths, staticmesh_paths, self.once)
+        return path, _file_signature(path) != before
+
+    def _remove_stale(self, paths):
+        """Remove the shards an earlier run wrote that this run did not, and record this run's
+
+        Returns the paths removed.
+        """
+        names = {os.path.basename(path) for path in paths}
+        removed = []
+        for name in sorted(self._read_shard_list() - names):
+            path = os.path.join(self.directory, name)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                # Tried again on the next run
+                names.add(name)
+                continue
+            removed.append(path)
+        with atomic_open(os.path.join(self.directory, SHARD_LIST_FILE), 'w', keep_unchanged=True) as f:
+            json.dump({"shards": sorted(names)}, f, indent=2)
+        return removed
+
+    def _read_shard_list(self):
+        """Names of the shards recorded by the last run; empty if there is no valid list"""
+        try:
+            with open(os.path.join(self.directory, SHARD_LIST_FILE), 'r', encoding='utf-8') as f:
+                names = json.load(f)["shards"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return set()
+        # Only plain file names, so the list can't point outside the directory
+        return {name for name in names
+                if isinstance(name, str) and name == os.path.basename(name) and name not in ("", ".", "..")}
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+
+
+def _paths_by_index(assets):
+    paths = [None] * len(assets)
+    for path, index in assets.items():
+        paths[index] = path
+    return paths
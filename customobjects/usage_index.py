@@ -0,0 +1,237 @@
+"""SQLite index of asset usage, filled from the conversion pass.
+
+Answers questions the INI cannot: which scenarios use an asset, how many
+placements use asset index 412, where those placements are, and which
+assets were skipped by which rule. Tables:
+
+    assets      type, asset_index, path, first_file, first_scenario
+    usage       scenario, type, asset_index, placements
+    placements  scenario, type, asset_index, x, y, z, roll, pitch, yaw, once
+    skipped     scenario, csv_file, rule, path, rows
+
+Placements are recorded just before they reach the entries of the first
+output, so they are exactly the Configs= lines written to it (after the
+deduper and culler). They are inserted in batches while the CSVs are
+parsed, into a temporary database next to the index that replaces it once
+complete; usage counts and the lookup indices are built at the end.
+"""
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from .engine import new_file_mode
+
+# Placements buffered before one executemany
+INSERT_BATCH = 50000
+
+SCHEMA = """
+CREATE TABLE assets (
+    type TEXT NOT NULL,
+    asset_index INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    first_file TEXT,
+    first_scenario TEXT,
+    PRIMARY KEY (type, asset_index)
+);
+CREATE TABLE usage (
+    scenario TEXT NOT NULL,
+    type TEXT NOT NULL,
+    asset_index INTEGER NOT NULL,
+    placements INTEGER NOT NULL
+);
+CREATE TABLE placements (
+    scenario TEXT NOT NULL,
+    type TEXT NOT NULL,
+    asset_index INTEGER NOT NULL,
+    x INTEGER, y INTEGER, z INTEGER,
+    roll INTEGER, pitch INTEGER, yaw INTEGER,
+    once INTEGER NOT NULL
+);
+CREATE TABLE skipped (
+    scenario TEXT NOT NULL,
+    csv_file TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+# Created after the bulk inserts, which is much faster than keeping them up to date
+INDICES = """
+INSERT INTO usage
+    SELECT scenario, type, asset_index, COUNT(*) FROM placements GROUP BY scenario, type, asset_index;
+CREATE INDEX assets_path ON assets (path);
+CREATE INDEX usage_asset ON usage (type, asset_index);
+CREATE INDEX placements_asset ON placements (type, asset_index);
+CREATE INDEX skipped_path ON skipped (path);
+"""
+
+
+def default_index_path(output_file):
+    """<output>.usage.db"""
+    return os.path.splitext(output_file)[0] + ".usage.db"
+
+
+class FirstSeenTap:
+    """Sink that notes the CSV each asset index first appears in, then passes entries on"""
+
+    def __init__(self, target, file_reports):
+        self.target = target
+        # The engine's (csv_path, scenario, FileStats) list; the last one is the current file
+        self.file_reports = file_reports
+        # type -> [(csv file name, scenario)] by asset index
+        self.first_seen = {'Blueprint': [], 'StaticMesh': []}
+
+    def append(self, entry):
+        # Indices are handed out in first-seen order, so a new asset is always the next one
+        seen = self.first_seen[entry['Type']]
+        if entry['AssetIndex'] >= len(seen):
+            csv_file, scenario, _ = self.file_reports[-1]
+            while len(seen) <= entry['AssetIndex']:
+                seen.append((os.path.basename(csv_file), scenario))
+        self.target.append(entry)
+
+
+class PlacementTap:
+    """Sink that inserts every entry into the placements table, then passes it on"""
+
+    def __init__(self, target, index):
+        self.target = target
+        self.index = index
+        self._batch = []
+
+    def append(self, entry):
+        batch = self._batch
+        batch.append((entry['Scenario'], entry['Type'], entry['AssetIndex']) + entry['Location'] + entry['Rotation']
+                     + (1 if entry.get('Once') else 0,))
+        if len(batch) >= INSERT_BATCH:
+            self.flush()
+        self.target.append(entry)
+
+    def flush(self):
+        if self._batch:
+            self.index.connection.executemany("INSERT INTO placements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                              self._batch)
+            self._batch = []
+
+
+class UsageIndexWriter:
+    """Builds the index database at path during one conversion"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._temp_path = tempfile.mkstemp(dir=directory, prefix=".customobjects-", suffix=".db")
+        os.close(fd)
+        self.connection = sqlite3.connect(self._temp_path)
+        # A half written index is thrown away anyway, so skip the journal
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.executescript(SCHEMA)
+        self.first_seen = None
+        self.placements = None
+
+    def wrap_run(self, sink, file_reports):
+        """Sink that records first sightings in front of sink"""
+        self.first_seen = FirstSeenTap(sink, file_reports)
+        return self.first_seen
+
+    def wrap_entries(self, entries):
+        """Sink that records placements in front of entries"""
+        self.placements = PlacementTap(entries, self)
+        return self.placements
+
+    def finish(self, blueprint_assets, staticmesh_assets, file_reports):
+        """Add the asset and skipped tables, build the indices and move the database into place"""
+        if self.placements is not None:
+            self.placements.flush()
+        first_seen = self.first_seen.first_seen if self.first_seen is not None else {}
+        connection = self.connection
+        for entry_type, assets in (('Blueprint', blueprint_assets), ('StaticMesh', staticmesh_assets)):
+            seen = first_seen.get(entry_type, [])
+            connection.executemany(
+                "INSERT INTO assets VALUES (?, ?, ?, ?, ?)",
+                ((entry_type, index, path) + (seen[index] if index < len(seen) else (None, None))
+                 for path, index in assets.items()))
+        for csv_file, scenario, stats in file_reports:
+            name = os.path.basename(csv_file)
+            connection.executemany("INSERT INTO skipped VALUES (?, ?, ?, ?, ?)",
+                                   ((scenario, name, rule, path, rows)
+                                    for (rule, path), rows in stats.skipped_assets.items()))
+        connection.executescript(INDICES)
+        connection.commit()
+        connection.close()
+        os.chmod(self._temp_path, new_file_mode(self.path))
+        os.replace(self._temp_path, self.path)
+
+    def discard(self):
+        """Drop the temporary database, e.g. when the conversion failed"""
+        self.connection.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def _connect(path):
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Usage index not found: {path}")
+    return sqlite3.connect(Path(path).absolute().as_uri() + "?mode=ro", uri=True)
+
+
+def _like(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def find_assets(path, text="", asset_index=None, asset_type=None, limit=500):
+    """Assets whose path contains text (or with asset_index), with their usage
+
+    Returns rows of (type, asset_index, path, first_file, scenarios,
+    placements), most used first.
+    """
+    where = ["a.path LIKE ? ESCAPE '\\'"]
+    params = [_like(text)]
+    if asset_index is not None:
+        where.append("a.asset_index = ?")
+        params.append(asset_index)
+    if asset_type:
+        where.append("a.type = ?")
+        params.append(asset_type)
+    query = f"""
+        SELECT a.type, a.asset_index, a.path, a.first_file,
+               COUNT(u.scenario), COALESCE(SUM(u.placements), 0) AS total
+        FROM assets a LEFT JOIN usage u ON u.type = a.type AND u.asset_index = a.asset_index
+        WHERE {' AND '.join(where)}
+        GROUP BY a.type, a.asset_index
+        ORDER BY total DESC, a.type, a.asset_index
+        LIMIT ?"""
+    with closing(_connect(path)) as connection:
+        return connection.execute(query, params + [limit]).fetchall()
+
+
+def scenario_usage(path, asset_type, asset_index):
+    """(scenario, placements) rows of one asset, most used first"""
+    with closing(_connect(path)) as connection:
+        return connection.execute(
+            "SELECT scenario, placements FROM usage WHERE type = ? AND asset_index = ? "
+            "ORDER BY placements DESC, scenario", (asset_type, asset_index)).fetchall()
+
+
+def find_skipped(path, text="", limit=500):
+    """(rule, path, rows, scenarios) of skipped assets whose path contains text"""
+    with closing(_connect(path)) as connection:
+        return connection.execute(
+            "SELECT rule, path, SUM(rows) AS total, COUNT(DISTINCT scenario) FROM skipped "
+            "WHERE path LIKE ? ESCAPE '\\' GROUP BY rule, path ORDER BY total DESC, path LIMIT ?",
+            (_like(text), limit)).fetchall()
+
+
+def run_query(path, sql):
+    """Run a read-only SQL query; returns (column names, rows)"""
+    with closing(_connect(path)) as connection:
+        cursor = connection.execute(sql)
+        columns = [column[0] for column in cursor.description or ()]
+        return columns, cursor.fetchall()
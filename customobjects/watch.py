@@ -0,0 +1,278 @@
+"""Watch mode: reconvert whenever a CSV changes, parsing only what changed.
+
+The watcher polls the size and modification time of each CSV. Parse
+results are kept in memory per file, as the ParseResults of the parallel
+module, so a change only re-parses that file. When a file only grew (its
+first bytes and the bytes before the last parsed offset are unchanged)
+just the appended rows are parsed, from that offset on. A trailing line
+without its newline yet is parsed separately and parsed again on the next
+change, so a row that is still being written is never lost.
+
+The output is regenerated by merging every file's results in input order,
+exactly like a parallel run, so it is identical to a full conversion.
+Changes are debounced: a burst of saves is handled once the files have
+been quiet for the debounce period.
+"""
+import glob
+import os
+import threading
+import time
+
+from .csv_input import CSV_PATTERNS, supports_ranges
+from .engine import DecisionCache, FileStats, OutputProfile, default_scenario_name
+from .parallel import ChunkEngine, WorkUnit
+from .run_report import StageTimings, build_run_report, report_path, write_run_report
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_DEBOUNCE = 2.0
+
+# Bytes compared at the start of a file and before the parsed offset to
+# tell an append from a rewrite
+SAMPLE_SIZE = 4096
+
+
+def _read_at(path, offset, size):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def _complete_end(path, size):
+    """Offset just after the last newline of the file, 0 if there is none"""
+    with open(path, 'rb') as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 64 * 1024)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+class WatchedFile:
+    """Parse state of one CSV: results of its complete lines and of a trailing fragment"""
+
+    def __init__(self, csv_file, scenario):
+        self.csv_file = csv_file
+        self.scenario = scenario
+        # (size, mtime_ns) when last parsed, None before the first parse
+        self.signature = None
+        # (size, mtime_ns) at the last poll, to tell when changes stop
+        self.seen = None
+        self.results = []
+        # End of the last complete line parsed
+        self.offset = 0
+        # ParseResult of a last line without its newline, or None
+        self.fragment = None
+        self.head = b""
+        self.before_offset = b""
+
+    def stat(self):
+        """Current (size, mtime_ns), or None if the file is missing"""
+        try:
+            st = os.stat(self.csv_file)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def all_results(self):
+        return self.results + [self.fragment] if self.fragment is not None else self.results
+
+    def appended_only(self, size):
+        """True if the file still starts with the bytes already parsed"""
+        if not self.results or size < self.offset:
+            return False
+        return (_read_at(self.csv_file, 0, len(self.head)) == self.head
+                and _read_at(self.csv_file, self.offset - len(self.before_offset),
+                             len(self.before_offset)) == self.before_offset)
+
+    def parse(self, parser, file_index, signature):
+        """Parse what changed; returns the bytes parsed and whether only the tail was read"""
+        size = signature[0]
+        if not supports_ranges(self.csv_file):
+            # Compressed or UTF-16: no byte offsets to resume from
+            self.results = [parser.parse(WorkUnit(file_index, self.csv_file, self.scenario))]
+            self.offset = 0
+            self.fragment = None
+            self.signature = signature
+            return size, False
+
+        appended = self.appended_only(size)
+        if not appended:
+            self.results = []
+            self.offset = 0
+        start = self.offset
+        end = _complete_end(self.csv_file, size)
+
+        if start < end:
+            self.results.append(parser.parse(WorkUnit(file_index, self.csv_file, self.scenario, start, end)))
+            self.offset = end
+        self.fragment = None
+        if end < size:
+            self.fragment = parser.parse(WorkUnit(file_index, self.csv_file, self.scenario, end, None))
+
+        self.signature = signature
+        self.head = _read_at(self.csv_file, 0, min(SAMPLE_SIZE, self.offset))
+        sample_start = max(0, self.offset - SAMPLE_SIZE)
+        self.before_offset = _read_at(self.csv_file, sample_start, self.offset - sample_start)
+        return size - start, appended
+
+
+class CsvWatcher:
+    """Polls CSVs (and optionally a directory of them) and rewrites the output on change"""
+
+    def __init__(self, engine, csv_files, output_file, directory=None, interval=DEFAULT_INTERVAL,
+                 debounce=DEFAULT_DEBOUNCE):
+        self.engine = engine
+        self.output_file = output_file
+        # New CSVs (plain or compressed) in directory are picked up with the default scenario name
+        self.directory = directory
+        self.interval = interval
+        self.debounce = debounce
+        self.files = [WatchedFile(csv_file, scenario) for csv_file, scenario in csv_files]
+        self.parser = ChunkEngine(engine.options)
+        # Files changed since the last rewrite, and when the last change was seen
+        self.pending = set()
+        # Set when a file was removed, which needs a rewrite but no parsing
+        self.removed = False
+        self.last_change = None
+        self.rewrites = 0
+
+    def run(self, stop=None):
+        """Convert once, then poll until stop (a threading.Event) is set"""
+        stop = stop if stop is not None else threading.Event()
+        self.poll()
+        self.process()
+        self.engine.log(f"\nWatching {len(self.files)} CSV file(s) for changes...")
+        while not stop.wait(self.interval):
+            self.poll()
+            if self.due():
+                self.process()
+
+    def poll(self):
+        """Check the files for changes; returns True if any was found"""
+        changed = False
+        if self.directory and self._scan_directory():
+            self.removed = changed = True
+        for state in self.files:
+            current = state.stat()
+            if current != state.seen:
+                state.seen = current
+                changed = True
+            if current != state.signature:
+                self.pending.add(state)
+        if changed:
+            self.last_change = time.monotonic()
+        return changed
+
+    def due(self):
+        """True when there are changes and none for the debounce period"""
+        return (bool(self.pending) or self.removed) and time.monotonic() - self.last_change >= self.debounce
+
+    def process(self):
+        """Parse the changed files and rewrite the output"""
+        log = self.engine.log
+        parsed = 0
+        for file_index, state in enumerate(self.files):
+            if state not in self.pending:
+                continue
+            signature = state.stat()
+            name = os.path.basename(state.csv_file)
+            if signature is None:
+                log(f"\n{name} is missing, leaving it out until it is back")
+                state.signature = None
+                state.results = []
+                state.fragment = None
+                continue
+            try:
+                read, appended = state.parse(self.parser, file_index, signature)
+            except (OSError, ValueError) as e:
+                # Possibly caught mid-write: retried on its next change
+                log(f"\nERROR: Could not parse {name}: {e}")
+                state.signature = signature
+                state.results = []
+                state.fragment = None
+                continue
+            parsed += 1
+            how = "appended rows" if appended else "whole file"
+            log(f"\nParsed {name} for scenario {state.scenario}: {how}, {read} bytes")
+        self.pending.clear()
+        self.removed = False
+        self.write_output()
+        return parsed
+
+    def write_output(self):
+        """Merge the results of every file in input order and write the output"""
+        engine = self.engine
+        started = time.time()
+        engine.rule_hits.clear()
+        engine.skipped_assets.clear()
+        engine.timings = StageTimings()
+        engine.file_reports = []
+        blueprint_assets = {}
+        staticmesh_assets = {}
+        cache = DecisionCache()
+        options = engine.options
+        profile = OutputProfile(self.output_file, options.add_once_to_blueprints, options.filter_all_blueprints,
+                                shard_dir=options.shard_dir)
+        run = engine._open_profile(profile)
+        engine.deduper = run.deduper
+        engine.culler = run.culler
+
+        try:
+            total_included = 0
+            for state in self.files:
+                if state.signature is None:
+                    continue
+                stats = FileStats()
+                engine.file_reports.append((state.csv_file, state.scenario, stats))
+                row_base = 0
+                for result in state.all_results():
+                    engine.merge_result(result, state.scenario, blueprint_assets, staticmesh_assets, run.sink,
+                                        cache, stats, row_base)
+                    # Row messages and problem assets are logged once, when first parsed
+                    result.events = []
+                    row_base += result.stats.rows
+                total_included += stats.included
+
+            if run.deduper is not None:
+                total_included -= engine.log_collapsed()
+            if run.culler is not None:
+                total_included -= engine.log_culled()
+            engine.log(f"\nTotal unique assets: {len(blueprint_assets) + len(staticmesh_assets)}")
+            engine.log(f"Total configuration entries: {total_included}")
+            engine.log_rule_hits()
+            engine.log_unknown_assets()
+            engine._write_profile(run, blueprint_assets, staticmesh_assets)
+        finally:
+            run.close()
+
+        self.rewrites += 1
+        engine.log(f"Output written to {self.output_file} ({time.strftime('%H:%M:%S')})")
+        if options.run_report:
+            path = report_path(self.output_file)
+            write_run_report(path, build_run_report(engine, self.output_file, started, time.time() - started,
+                                                    [run]))
+
+    def _scan_directory(self):
+        """Pick up new CSVs in the directory and drop removed ones; returns True if any was removed"""
+        directory = os.path.abspath(self.directory)
+        paths = sorted(path for pattern in CSV_PATTERNS for path in glob.glob(os.path.join(directory, pattern)))
+        present = {os.path.abspath(path): path for path in paths}
+        removed = False
+        for state in list(self.files):
+            path = os.path.abspath(state.csv_file)
+            if os.path.dirname(path) == directory and path not in present:
+                self.engine.log(f"\nCSV removed: {os.path.basename(path)}")
+                self.files.remove(state)
+                self.pending.discard(state)
+                removed = True
+        known = {os.path.abspath(state.csv_file) for state in self.files}
+        for path in present.values():
+            if os.path.abspath(path) not in known:
+                self.engine.log(f"\nNew CSV: {os.path.basename(path)}")
+                self.files.append(WatchedFile(path, default_scenario_name(path)))
+        return removed